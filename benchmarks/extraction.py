@@ -0,0 +1,267 @@
+"""
+End-to-end extraction benchmarks against the local mock of the 42 API: `basic_extraction`, `filtered_extraction` and the piscine fan-out of `piscine_2025_start.py`.
+
+Every scenario reports its wall time, pages per second, requests per extracted record and the peak memory allocated while extracting, traced in a sample of its own so tracing doesn't slow down the timed ones. Each sample runs in its own subprocess and temporary data directory, against a mock serving the same seeded dataset with the same latency and rate limits, so the numbers are comparable from one commit to the next. Results are compared with `extraction_baseline.json`:
+
+    python benchmarks/extraction.py                    # measure and compare with the baseline
+    python benchmarks/extraction.py --update-baseline  # record the current numbers as the baseline
+    python benchmarks/extraction.py --scenario basic   # measure a single scenario
+
+The script exits with status 1 when a metric regresses by more than the tolerance. Results measured with other settings or another JSON backend than the baseline's aren't compared.
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from mock_api import C_PISCINE_CURSUS_ID, RIO_CAMPUS_ID, MockAPI
+
+ROOT = Path(__file__).parent.parent.resolve()
+BASELINE_FILE = Path(__file__).parent / "extraction_baseline.json"
+
+DEFAULT_RUNS = 3
+DEFAULT_TOLERANCE = 1.5
+
+# Mock settings the baseline was measured with; numbers measured with other settings aren't compared.
+DEFAULT_SETTINGS = {
+    "users": 5000,
+    "latency": 0.01,
+    "secondly_limit": 20,
+    "hourly_limit": 100000,
+    "max_workers": 1,
+}
+
+HIGHER_IS_BETTER = {"pages_per_sec"}
+
+
+def scenario_basic(extractor) -> None:
+    extractor.basic_extraction("users", **{"filter[primary_campus_id]": RIO_CAMPUS_ID})
+
+
+def scenario_filtered(extractor) -> None:
+    extractor.filtered_extraction(
+        "projects", "cursus/{cursus_id}/projects", {"cursus_id": C_PISCINE_CURSUS_ID}
+    )
+
+
+def scenario_piscine_fanout(extractor) -> None:
+    from piscine_2025_start import extract_piscine_2025_projects_init, extract_piscine_2025_users
+
+    logger = logging.getLogger("BENCHMARK")
+    extract_piscine_2025_users(logger, extractor, RIO_CAMPUS_ID)
+    extract_piscine_2025_projects_init(
+        logger,
+        extractor,
+        RIO_CAMPUS_ID,
+        extractor.load("piscine_2025_users", fields=["id"]),
+    )
+
+
+SCENARIOS = {
+    "basic": scenario_basic,
+    "filtered": scenario_filtered,
+    "piscine_fanout": scenario_piscine_fanout,
+}
+
+
+def run_scenario(name: str, max_workers: int, trace_memory: bool = False) -> dict:
+    """
+    Runs a scenario in the current process, which the environment must point at the mock.
+
+    Returns:
+        The wall time of the extraction, and the peak memory it allocated in MB when traced.
+    """
+    sys.path.insert(0, str(ROOT / "src"))
+    from FT_Extractor import FT_Extractor
+    from helpers.codec import get_codec
+
+    extractor = FT_Extractor(max_workers=max_workers)
+    # The JSON backend is imported on first use, which is setup rather than extraction.
+    get_codec()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    SCENARIOS[name](extractor)
+    wall_time = time.perf_counter() - start
+
+    peak_mb = None
+    if trace_memory:
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+
+    return {"wall_s": wall_time, "peak_mb": peak_mb}
+
+
+def _sample(api: MockAPI, name: str, settings: dict, env: dict, trace_memory: bool = False) -> dict:
+    api.reset_stats()
+    with tempfile.TemporaryDirectory() as data_root:
+        (Path(data_root) / "data").mkdir()
+        process = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--run-scenario",
+                name,
+                "--max-workers",
+                str(settings["max_workers"]),
+                *(["--trace-memory"] if trace_memory else []),
+            ],
+            cwd=data_root,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+    if process.returncode != 0:
+        raise RuntimeError(f"Scenario {name} failed:\n{process.stderr}")
+
+    measures = json.loads(process.stdout.strip().splitlines()[-1])
+    if trace_memory:
+        return {"peak_mb": measures["peak_mb"]}
+
+    stats = api.stats()
+    return {
+        "wall_s": measures["wall_s"],
+        "pages_per_sec": stats["pages"] / measures["wall_s"],
+        "requests_per_record": stats["requests"] / max(1, stats["items"]),
+        "requests": stats["requests"],
+        "records": stats["items"],
+        "throttled": stats["throttled"],
+    }
+
+
+def run(scenarios: list[str], settings: dict, runs: int = DEFAULT_RUNS) -> dict:
+    """
+    Measures every scenario, as medians over `runs` timed samples plus a traced one.
+    """
+    api = MockAPI(
+        users=settings["users"],
+        latency=settings["latency"],
+        secondly_limit=settings["secondly_limit"],
+        hourly_limit=settings["hourly_limit"],
+    ).start()
+
+    env = {**os.environ, **api.env(), "LOG_LEVEL": "WARNING"}
+    env.pop("K_SERVICE", None)
+    env.pop("CLIENT_APPLICATIONS", None)
+
+    results = {}
+    try:
+        for name in scenarios:
+            samples = [_sample(api, name, settings, env) for _ in range(runs)]
+            results[name] = {
+                metric: round(statistics.median(sample[metric] for sample in samples), 4)
+                for metric in samples[0]
+            }
+            results[name].update(_sample(api, name, settings, env, trace_memory=True))
+            results[name]["peak_mb"] = round(results[name]["peak_mb"], 2)
+    finally:
+        api.stop()
+
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Lists the metrics worse than their baseline by more than `tolerance` times.
+    """
+    regressions = []
+    for name, metrics in results.items():
+        for metric in ("wall_s", "pages_per_sec", "requests_per_record", "peak_mb"):
+            value, reference = metrics[metric], baseline.get(name, {}).get(metric)
+            if reference is None:
+                continue
+            if metric in HIGHER_IS_BETTER:
+                regressed = value * tolerance < reference
+            else:
+                regressed = value > reference * tolerance
+            if regressed:
+                regressions.append(f"{name} {metric}: {value} (baseline {reference})")
+
+    return regressions
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _json_backend() -> str:
+    sys.path.insert(0, str(ROOT))
+    from helpers.codec import get_codec
+
+    return get_codec().name
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Scenario to run, every one by default.")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_SETTINGS["max_workers"])
+    parser.add_argument("--latency", type=float, default=DEFAULT_SETTINGS["latency"])
+    parser.add_argument("--secondly-limit", type=int, default=DEFAULT_SETTINGS["secondly_limit"])
+    parser.add_argument("--run-scenario", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--trace-memory", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_scenario:
+        print(json.dumps(run_scenario(args.run_scenario, args.max_workers, args.trace_memory)))
+        return 0
+
+    settings = {
+        **DEFAULT_SETTINGS,
+        "latency": args.latency,
+        "secondly_limit": args.secondly_limit,
+        "max_workers": args.max_workers,
+    }
+    results = {
+        "commit": _commit(),
+        "json_backend": _json_backend(),
+        "settings": settings,
+        "scenarios": run(args.scenario or list(SCENARIOS), settings, args.runs),
+    }
+    print(json.dumps(results, indent=4))
+
+    if args.update_baseline:
+        BASELINE_FILE.write_text(json.dumps(results, indent=4) + "\n")
+        print(f"Baseline saved to {BASELINE_FILE}.")
+        return 0
+
+    if not BASELINE_FILE.exists():
+        print("No baseline yet, run with --update-baseline to record one.")
+        return 0
+
+    baseline = json.loads(BASELINE_FILE.read_text())
+    if baseline.get("settings") != settings:
+        print("The baseline was measured with other settings, not comparing.")
+        return 0
+    if baseline.get("json_backend") != results["json_backend"]:
+        print(f"The baseline was measured with the {baseline.get('json_backend')} JSON backend, not comparing.")
+        return 0
+
+    regressions = compare(results["scenarios"], baseline["scenarios"], args.tolerance)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,599 @@
+"""
+Local stand-in for École 42's API, so extractions can be measured and replayed without the network or the real rate limits.
+
+Serves the OAuth token endpoint and the paginated endpoints the scripts use (`campus`, `cursus`, `users`, `projects_users`, `cursus/{id}/projects` and `users/{id}/projects_users`) from a synthetic dataset, generated from a seed so every run serves the same pages. Responses carry the API's `Link`, `X-Total` and rate-limit headers. Each application gets its own secondly and hourly budget, answered with 429s once exceeded, and every request can be delayed by a fixed latency.
+
+    >>> with MockAPI(latency=0.01) as api:
+    ...     os.environ.update(api.env())
+    ...     FT_Extractor().basic_extraction("campus")
+
+It can also be run on its own, to point the extraction scripts at it:
+
+    python benchmarks/mock_api.py --port 8042
+"""
+
+import argparse
+import json
+import random
+import re
+import secrets
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+RIO_CAMPUS_ID = 28
+C_PISCINE_CURSUS_ID = 9
+BASECAMP_CURSUS_ID = 51
+
+DEFAULT_USERS = 2000
+DEFAULT_PROJECTS_PER_CURSUS = 120
+DEFAULT_PROJECTS_PER_USER = 8
+DEFAULT_SECONDLY_LIMIT = 2
+DEFAULT_HOURLY_LIMIT = 1200
+DEFAULT_TOKEN_TTL = 7200
+DEFAULT_SEED = 42
+
+DEFAULT_PAGE_SIZE = 30
+MAX_PAGE_SIZE = 100
+
+CAMPUSES = [
+    (1, "Paris", "Europe/Paris"),
+    (9, "Lyon", "Europe/Paris"),
+    (20, "São Paulo", "America/Sao_Paulo"),
+    (RIO_CAMPUS_ID, "Rio de Janeiro", "America/Sao_Paulo"),
+    (37, "Lisboa", "Europe/Lisbon"),
+]
+
+CURSUS = [
+    (1, "42", "42"),
+    (C_PISCINE_CURSUS_ID, "C Piscine", "c-piscine"),
+    (21, "42cursus", "42cursus"),
+    (BASECAMP_CURSUS_ID, "Basecamp", "basecamp"),
+]
+
+POOL_YEARS = [2021, 2022, 2023, 2024, 2025]
+POOL_MONTHS = ["january", "february", "march", "july", "august", "september"]
+STATUSES = ["finished", "finished", "finished", "in_progress", "waiting_for_correction"]
+
+# Filters reading a nested field instead of the one named after them.
+FILTER_PATHS = {
+    "user_id": "user.id",
+    "project_id": "project.id",
+    "cursus": "cursus_ids",
+    "cursus_id": "cursus_ids",
+}
+
+USER_PROJECTS_PATH = re.compile(r"^users/(\d+)/projects_users$")
+CURSUS_PROJECTS_PATH = re.compile(r"^cursus/(\d+)/projects$")
+
+EPOCH = datetime(2021, 1, 1, tzinfo=timezone.utc)
+
+
+def _timestamp(rng: random.Random) -> str:
+    moment = EPOCH + timedelta(seconds=rng.randrange(5 * 365 * 24 * 3600))
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _get_path(item: dict, path: str):
+    for key in path.split("."):
+        if not isinstance(item, dict):
+            return None
+        item = item.get(key)
+    return item
+
+
+def build_dataset(
+    users: int = DEFAULT_USERS,
+    projects_per_cursus: int = DEFAULT_PROJECTS_PER_CURSUS,
+    projects_per_user: int = DEFAULT_PROJECTS_PER_USER,
+    seed: int = DEFAULT_SEED,
+) -> dict:
+    """
+    Generates the records served by the mock, shaped like the API's.
+
+    Args:
+        users: Number of users, about half of them from the Rio campus.
+        projects_per_cursus: Number of projects of each cursus.
+        projects_per_user: Number of C Piscine projects_users of each user.
+        seed: Seed of the generator, the same seed always giving the same dataset.
+
+    Returns:
+        A dictionary of record lists: "campus", "cursus", "users", "projects_users", and "projects" mapping each cursus id to its projects.
+    """
+    rng = random.Random(seed)
+
+    campus = [
+        {
+            "id": campus_id,
+            "name": name,
+            "city": name,
+            "time_zone": time_zone,
+            "language": {"id": 2, "name": "English", "identifier": "en"},
+            "users_count": 0,
+            "active": True,
+            "public": True,
+        }
+        for campus_id, name, time_zone in CAMPUSES
+    ]
+    cursus = [
+        {"id": cursus_id, "name": name, "slug": slug, "kind": "main", "created_at": _timestamp(rng)}
+        for cursus_id, name, slug in CURSUS
+    ]
+
+    projects = {}
+    for cursus_id, cursus_name, cursus_slug in CURSUS:
+        projects[cursus_id] = [
+            {
+                "id": cursus_id * 10000 + number,
+                "name": f"{cursus_name} {number:02d}",
+                "slug": f"{cursus_slug}-{number:02d}",
+                "difficulty": rng.choice([0, 100, 500, 1000, 2000]),
+                "parent": None,
+                "children": [],
+                "exam": rng.random() < 0.1,
+                "cursus": [{"id": cursus_id, "name": cursus_name, "slug": cursus_slug}],
+                "campus": [{"id": campus_id, "name": name} for campus_id, name, _ in CAMPUSES],
+                "created_at": _timestamp(rng),
+                "updated_at": _timestamp(rng),
+            }
+            for number in range(1, projects_per_cursus + 1)
+        ]
+
+    campus_ids = [campus_id for campus_id, _, _ in CAMPUSES]
+    piscine_projects = projects[C_PISCINE_CURSUS_ID]
+    user_list = []
+    projects_users = []
+    for user_id in range(1, users + 1):
+        login = f"user{user_id:05d}"
+        primary_campus_id = RIO_CAMPUS_ID if rng.random() < 0.5 else rng.choice(campus_ids)
+        user = {
+            "id": user_id,
+            "email": f"{login}@student.42.fr",
+            "login": login,
+            "first_name": f"First{user_id}",
+            "last_name": f"Last{user_id}",
+            "usual_full_name": f"First{user_id} Last{user_id}",
+            "url": f"https://api.intra.42.fr/v2/users/{login}",
+            "displayname": f"First{user_id} Last{user_id}",
+            "kind": "student",
+            "image": {
+                "link": f"https://cdn.intra.42.fr/users/{login}.jpg",
+                "versions": {
+                    size: f"https://cdn.intra.42.fr/users/{size}_{login}.jpg"
+                    for size in ("large", "medium", "small", "micro")
+                },
+            },
+            "staff?": False,
+            "correction_point": rng.randrange(20),
+            "pool_month": rng.choice(POOL_MONTHS),
+            "pool_year": str(rng.choice(POOL_YEARS)),
+            "primary_campus_id": primary_campus_id,
+            "location": None,
+            "wallet": rng.randrange(500),
+            "created_at": _timestamp(rng),
+            "updated_at": _timestamp(rng),
+            "alumni?": False,
+            "active?": True,
+        }
+        user_list.append(user)
+
+        for project in rng.sample(piscine_projects, min(projects_per_user, len(piscine_projects))):
+            status = rng.choice(STATUSES)
+            projects_users.append(
+                {
+                    "id": len(projects_users) + 1,
+                    "occurrence": rng.randrange(3),
+                    "final_mark": rng.randrange(126) if status == "finished" else None,
+                    "status": status,
+                    "validated?": status == "finished" and rng.random() < 0.7,
+                    "current_team_id": rng.randrange(1, 10**6),
+                    "project": {
+                        "id": project["id"],
+                        "name": project["name"],
+                        "slug": project["slug"],
+                        "parent_id": None,
+                    },
+                    "cursus_ids": [C_PISCINE_CURSUS_ID],
+                    "marked_at": _timestamp(rng) if status == "finished" else None,
+                    "marked": status == "finished",
+                    "created_at": _timestamp(rng),
+                    "updated_at": _timestamp(rng),
+                    "user": {"id": user_id, "login": login, "url": user["url"]},
+                }
+            )
+
+    for record in campus:
+        record["users_count"] = sum(user["primary_campus_id"] == record["id"] for user in user_list)
+
+    return {
+        "campus": campus,
+        "cursus": cursus,
+        "users": user_list,
+        "projects_users": projects_users,
+        "projects": projects,
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, status: int, body, headers: dict | None = None) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+        self._reply(*self.server.api.handle_token(self.path, self.headers, body))
+
+    def do_GET(self) -> None:
+        self._reply(*self.server.api.handle_get(self.path, self.headers))
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, api: "MockAPI"):
+        super().__init__(address, _Handler)
+        self.api = api
+
+
+class MockAPI:
+    """
+    A mock 42 API served over HTTP on a background thread.
+
+    Attributes:
+        latency: Seconds every response is delayed by.
+        secondly_limit: Requests each application may send per second before getting 429s.
+        hourly_limit: Requests each application may send per hour before getting 429s.
+        token_ttl: Lifetime of the access tokens, in seconds.
+        throttle_every: Answer every nth API request with a 429 whatever the budget, 0 to never do so.
+    """
+
+    def __init__(
+        self,
+        users: int = DEFAULT_USERS,
+        projects_per_cursus: int = DEFAULT_PROJECTS_PER_CURSUS,
+        projects_per_user: int = DEFAULT_PROJECTS_PER_USER,
+        latency: float = 0.0,
+        secondly_limit: int = DEFAULT_SECONDLY_LIMIT,
+        hourly_limit: int = DEFAULT_HOURLY_LIMIT,
+        token_ttl: int = DEFAULT_TOKEN_TTL,
+        throttle_every: int = 0,
+        seed: int = DEFAULT_SEED,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """
+        Generates the dataset and binds the server, which only serves once started.
+
+        Args:
+            users: Number of users in the dataset, see `build_dataset`.
+            projects_per_cursus: Number of projects of each cursus.
+            projects_per_user: Number of projects_users of each user.
+            latency: Seconds every response is delayed by.
+            secondly_limit: Requests each application may send per second.
+            hourly_limit: Requests each application may send per hour.
+            token_ttl: Lifetime of the access tokens, in seconds.
+            throttle_every: Answer every nth API request with a 429, 0 to never do so.
+            seed: Seed of the dataset.
+            host: Address to listen on.
+            port: Port to listen on, any free one when 0.
+        """
+        self.latency = latency
+        self.secondly_limit = secondly_limit
+        self.hourly_limit = hourly_limit
+        self.token_ttl = token_ttl
+        self.throttle_every = throttle_every
+
+        self._dataset = build_dataset(users, projects_per_cursus, projects_per_user, seed)
+        self._projects_users_by_user = {}
+        for item in self._dataset["projects_users"]:
+            self._projects_users_by_user.setdefault(item["user"]["id"], []).append(item)
+
+        self._lock = threading.Lock()
+        self._tokens = {}
+        self._budgets = {}
+        self._views = {}
+        self._stats = Counter()
+        self._thread = None
+        self._server = _Server((host, port), self)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self, client_id: str = "benchmark", client_secret: str = "benchmark") -> dict:
+        """
+        Environment variables pointing the clients at the mock.
+        """
+        return {
+            "REQ_URL": f"{self.base_url}/v2/",
+            "TOKEN_URL": f"{self.base_url}/oauth/token",
+            "CLIENT_ID": client_id,
+            "CLIENT_SECRET": client_secret,
+        }
+
+    def start(self) -> "MockAPI":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """
+        Serves on the calling thread until interrupted.
+        """
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockAPI":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def stats(self) -> dict:
+        """
+        Counts of what was served since the last reset.
+
+        Returns:
+            A dictionary with "requests" (API requests, throttled ones included), "pages" (successful API responses), "items" (records in them), "tokens" (tokens issued), "throttled", "unauthorized" and "not_found".
+        """
+        with self._lock:
+            return {
+                key: self._stats[key]
+                for key in ("requests", "pages", "items", "tokens", "throttled", "unauthorized", "not_found")
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def handle_token(self, path: str, headers, body: str) -> tuple:
+        if self.latency:
+            time.sleep(self.latency)
+        if urlsplit(path).path != "/oauth/token":
+            return 404, {"error": "Not Found"}
+
+        form = {key: values[0] for key, values in parse_qs(body).items()}
+        if not form and body:
+            try:
+                form = json.loads(body)
+            except ValueError:
+                form = {}
+        if form.get("grant_type") != "client_credentials" or not form.get("client_id"):
+            return 400, {"error": "invalid_request"}
+
+        token = secrets.token_hex(32)
+        now = time.time()
+        with self._lock:
+            self._tokens[token] = (form["client_id"], now + self.token_ttl)
+            self._stats["tokens"] += 1
+
+        return 200, {
+            "access_token": token,
+            "token_type": "bearer",
+            "expires_in": self.token_ttl,
+            "scope": "public",
+            "created_at": int(now),
+        }
+
+    def handle_get(self, path: str, headers) -> tuple:
+        if self.latency:
+            time.sleep(self.latency)
+
+        url = urlsplit(path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        authorization = headers.get("Authorization", "")
+        token = authorization.removeprefix("Bearer ").strip()
+        now = time.time()
+        with self._lock:
+            client_id, expires_at = self._tokens.get(token, (None, 0.0))
+            if client_id is None or expires_at <= now:
+                self._stats["unauthorized"] += 1
+                return 401, {"error": "Not authorized", "message": "The access token is invalid"}
+
+            self._stats["requests"] += 1
+            rate_headers, retry_after = self._spend(client_id, now)
+            if retry_after is not None:
+                self._stats["throttled"] += 1
+                return 429, {"error": "Too Many Requests"}, {**rate_headers, "Retry-After": retry_after}
+
+        items = self._resolve(url.path.removeprefix("/v2/").strip("/"))
+        if items is None:
+            with self._lock:
+                self._stats["not_found"] += 1
+            return 404, {"error": "Not Found"}, rate_headers
+
+        page_key = "page[number]" if "page[number]" in query else "page"
+        size_key = "page[size]" if "page[size]" in query else "per_page"
+        try:
+            items = self._view(url.path, items, query)
+            page = max(1, int(query.get(page_key, 1)))
+            size = min(MAX_PAGE_SIZE, max(1, int(query.get(size_key, DEFAULT_PAGE_SIZE))))
+        except ValueError as e:
+            return 400, {"error": "Bad Request", "message": str(e)}, rate_headers
+        last_page = max(1, -(-len(items) // size))
+        body = items[(page - 1) * size : page * size]
+
+        with self._lock:
+            self._stats["pages"] += 1
+            self._stats["items"] += len(body)
+
+        return 200, body, {
+            **rate_headers,
+            "Link": self._link(url.path, query, page_key, size_key, size, page, last_page),
+            "X-Page": page,
+            "X-Per-Page": size,
+            "X-Total": len(items),
+        }
+
+    def _spend(self, client_id: str, now: float) -> tuple[dict, int | None]:
+        second, hour = int(now), int(now // 3600)
+        budget = self._budgets.get(client_id)
+        if budget is None or budget["hour"] != hour:
+            budget = self._budgets[client_id] = {"second": second, "secondly": 0, "hour": hour, "hourly": 0}
+        if budget["second"] != second:
+            budget["second"], budget["secondly"] = second, 0
+
+        throttled = self.throttle_every and self._stats["requests"] % self.throttle_every == 0
+        retry_after = None
+        if budget["hourly"] >= self.hourly_limit:
+            retry_after = 3600 - int(now) % 3600
+        elif throttled or budget["secondly"] >= self.secondly_limit:
+            retry_after = 1
+        else:
+            budget["secondly"] += 1
+            budget["hourly"] += 1
+
+        return {
+            "X-Secondly-RateLimit-Limit": self.secondly_limit,
+            "X-Secondly-RateLimit-Remaining": max(0, self.secondly_limit - budget["secondly"]),
+            "X-Hourly-RateLimit-Limit": self.hourly_limit,
+            "X-Hourly-RateLimit-Remaining": max(0, self.hourly_limit - budget["hourly"]),
+        }, retry_after
+
+    def _resolve(self, endpoint: str) -> list | None:
+        if endpoint in ("campus", "cursus", "users", "projects_users"):
+            return self._dataset[endpoint]
+
+        match = USER_PROJECTS_PATH.match(endpoint)
+        if match:
+            return self._projects_users_by_user.get(int(match.group(1)), [])
+
+        match = CURSUS_PROJECTS_PATH.match(endpoint)
+        if match:
+            return self._dataset["projects"].get(int(match.group(1)))
+
+        return None
+
+    def _view(self, path: str, items: list, query: dict) -> list:
+        """
+        Filters, restricts and sorts the items of an endpoint as the query asks, memoized since the dataset never changes.
+        """
+        criteria = tuple(
+            sorted(
+                (key, value)
+                for key, value in query.items()
+                if key.startswith(("filter[", "range[")) or key == "sort"
+            )
+        )
+        key = (path, criteria)
+        view = self._views.get(key)
+        if view is not None:
+            return view
+
+        view = items
+        for name, value in criteria:
+            if name.startswith("filter["):
+                field = name[len("filter[") : -1]
+                view = self._filter(view, FILTER_PATHS.get(field, field), set(value.split(",")))
+            elif name.startswith("range["):
+                field = name[len("range[") : -1]
+                lower, upper = value.split(",")
+                if field.endswith("_at"):
+                    # ISO 8601 timestamps in UTC sort as strings.
+                    view = [item for item in view if item.get(field) and lower <= item[field] <= upper]
+                else:
+                    lower, upper = float(lower), float(upper)
+                    view = [
+                        item for item in view
+                        if isinstance(item.get(field), (int, float)) and lower <= item[field] <= upper
+                    ]
+
+        sort = query.get("sort")
+        if sort:
+            field = sort.split(",")[0]
+            view = sorted(
+                view,
+                key=lambda item: (item.get(field.lstrip("-")) is None, item.get(field.lstrip("-"))),
+                reverse=field.startswith("-"),
+            )
+
+        self._views[key] = view
+        return view
+
+    @staticmethod
+    def _filter(items: list, path: str, values: set) -> list:
+        def matches(item: dict) -> bool:
+            value = _get_path(item, path)
+            if isinstance(value, list):
+                return any(str(element) in values for element in value)
+            return str(value).lower() in values or str(value) in values
+
+        return [item for item in items if matches(item)]
+
+    def _link(
+        self,
+        path: str,
+        query: dict,
+        page_key: str,
+        size_key: str,
+        size: int,
+        page: int,
+        last_page: int,
+    ) -> str:
+        relations = {"first": 1, "last": last_page}
+        if page > 1:
+            relations["prev"] = page - 1
+        if page < last_page:
+            relations["next"] = page + 1
+
+        links = [
+            f'<{self.base_url}{path}?{urlencode({**query, page_key: number, size_key: size})}>; rel="{relation}"'
+            for relation, number in relations.items()
+        ]
+        return ", ".join(links)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8042)
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds every response is delayed by.")
+    parser.add_argument("--secondly-limit", type=int, default=DEFAULT_SECONDLY_LIMIT)
+    parser.add_argument("--hourly-limit", type=int, default=DEFAULT_HOURLY_LIMIT)
+    parser.add_argument("--throttle-every", type=int, default=0, help="Answer every nth request with a 429.")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    api = MockAPI(
+        users=args.users,
+        latency=args.latency,
+        secondly_limit=args.secondly_limit,
+        hourly_limit=args.hourly_limit,
+        throttle_every=args.throttle_every,
+        seed=args.seed,
+        host=args.host,
+        port=args.port,
+    )
+    for name, value in api.env().items():
+        print(f"export {name}={value}")
+
+    api.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
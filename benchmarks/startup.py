@@ -0,0 +1,118 @@
+"""
+Startup benchmark of the extraction scripts: import time of `FT_Extractor` and time-to-first-request, from a fresh interpreter to the first API response.
+
+Each sample runs in its own subprocess, against a local stand-in for the 42 API, so neither the network nor warm module caches skew the numbers. Results are compared with `startup_baseline.json`:
+
+    python benchmarks/startup.py                    # measure and compare with the baseline
+    python benchmarks/startup.py --update-baseline  # record the current numbers as the baseline
+
+The script exits with status 1 when a metric regresses by more than the tolerance.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from mock_api import MockAPI
+
+ROOT = Path(__file__).parent.parent.resolve()
+BASELINE_FILE = Path(__file__).parent / "startup_baseline.json"
+
+DEFAULT_RUNS = 15
+DEFAULT_TOLERANCE = 1.5
+
+IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, "src")
+import FT_Extractor
+print(time.perf_counter() - start)
+"""
+
+FIRST_REQUEST_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, "src")
+from FT_Extractor import FT_Extractor
+FT_Extractor().basic_extraction("campus")
+print(time.perf_counter() - start)
+"""
+
+
+def _measure(snippet: str, env: dict, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", snippet],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+
+    return statistics.median(samples)
+
+
+def run(runs: int = DEFAULT_RUNS) -> dict:
+    """
+    Measures the startup metrics, as medians in milliseconds.
+    """
+    api = MockAPI(users=0, secondly_limit=1000).start()
+
+    env = {**os.environ, **api.env(), "LOG_LEVEL": "WARNING"}
+    env.pop("K_SERVICE", None)
+
+    try:
+        return {
+            "import_ms": round(_measure(IMPORT_SNIPPET, env, runs) * 1000, 1),
+            "first_request_ms": round(_measure(FIRST_REQUEST_SNIPPET, env, runs) * 1000, 1),
+        }
+    finally:
+        api.stop()
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Lists the metrics slower than `tolerance` times their baseline.
+    """
+    return [
+        f"{metric}: {value} ms (baseline {baseline[metric]} ms)"
+        for metric, value in results.items()
+        if metric in baseline and value > baseline[metric] * tolerance
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = run(args.runs)
+    print(json.dumps(results, indent=4))
+
+    if args.update_baseline:
+        BASELINE_FILE.write_text(json.dumps(results, indent=4) + "\n")
+        print(f"Baseline saved to {BASELINE_FILE}.")
+        return 0
+
+    if not BASELINE_FILE.exists():
+        print("No baseline yet, run with --update-baseline to record one.")
+        return 0
+
+    regressions = compare(results, json.loads(BASELINE_FILE.read_text()), args.tolerance)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
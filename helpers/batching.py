@@ -0,0 +1,93 @@
+"""
+Helpers to pack many ids into comma-separated filters, such as `filter[user_id]=1,2,3`, so a fan-out over hundreds of users costs a handful of requests instead of one probe and one page per user.
+"""
+
+from typing import Callable, Hashable, Iterable, Iterator
+from urllib.parse import quote, urlencode
+
+MAX_URL_LENGTH = 2000
+DEFAULT_BATCH_SIZE = 100
+MAX_ITEMS_PER_BATCH = 1000
+
+
+def filter_length_budget(request_url: str, params: dict, filter_name: str) -> int:
+    """
+    Room left for the value of `filter_name` once the URL, the other params and the filter's own name are counted, so the packed URL stays under MAX_URL_LENGTH.
+
+    Args:
+        request_url: URL of the endpoint, without query string.
+        params: Every other query param of the request.
+        filter_name: Name of the packed filter, such as "filter[user_id]".
+
+    Returns:
+        The `max_length` to give `chunk_ids`.
+    """
+    base_url = f"{request_url}?{urlencode(params)}"
+    return MAX_URL_LENGTH - len(base_url) - len(urlencode({filter_name: ""})) - 1
+
+
+def chunk_ids(
+    ids: Iterable,
+    max_ids: int = DEFAULT_BATCH_SIZE,
+    max_length: int = MAX_URL_LENGTH,
+    items_per_id: int | None = None,
+    max_items: int = MAX_ITEMS_PER_BATCH,
+) -> Iterator[list]:
+    """
+    Splits ids into chunks whose comma-separated, URL-encoded form fits in `max_length` characters.
+
+    Args:
+        ids: Ids to pack. Duplicates are dropped, order is kept.
+        max_ids: Maximum number of ids in a chunk.
+        max_length: Maximum length of the encoded filter value.
+        items_per_id: Expected number of items returned per id, used to keep each chunk under `max_items`.
+        max_items: Maximum number of items a chunk should return, so its pagination stays shallow.
+
+    Yields:
+        Lists of ids, in their original order.
+    """
+    if items_per_id:
+        max_ids = min(max_ids, max(1, max_items // items_per_id))
+
+    separator_length = len(quote(","))
+    chunk = []
+    length = 0
+
+    for item_id in dict.fromkeys(ids):
+        id_length = len(quote(str(item_id)))
+        added_length = id_length + (separator_length if chunk else 0)
+
+        if chunk and (len(chunk) >= max_ids or length + added_length > max_length):
+            yield chunk
+            chunk = []
+            length = 0
+            added_length = id_length
+
+        chunk.append(item_id)
+        length += added_length
+
+    if chunk:
+        yield chunk
+
+
+def group_items(
+    items: Iterable[dict],
+    key: Callable[[dict], Hashable],
+    groups: dict | None = None,
+) -> dict:
+    """
+    Regroups the items of a batched request per id.
+
+    Args:
+        items: Items returned by the batched request.
+        key: Function extracting the id an item belongs to, such as `lambda item: item["user"]["id"]`.
+        groups: Existing groups to extend, for example pre-filled with an empty list per requested id.
+
+    Returns:
+        A dictionary mapping each id to the list of its items.
+    """
+    groups = {} if groups is None else groups
+    for item in items:
+        groups.setdefault(key(item), []).append(item)
+
+    return groups
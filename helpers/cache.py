@@ -0,0 +1,242 @@
+"""
+On-disk HTTP response cache for reference data that rarely changes, such as campus, cursus and curricula.
+
+Responses are keyed by URL and normalized params, kept for a per-endpoint TTL, revalidated with `If-None-Match`/`If-Modified-Since` once stale, and evicted least recently used first when the cache grows over its size cap.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from fnmatch import fnmatch
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from helpers.pagination import endpoint_from_url
+from helpers.sinks import tmp_path_for
+
+DEFAULT_CACHE_DIR = "data/.http_cache"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+EVICTION_TARGET = 0.9
+
+DEFAULT_TTLS = {
+    "campus": 24 * 3600,
+    "cursus": 24 * 3600,
+    "cursus/*/projects": 24 * 3600,
+}
+
+CACHED_HEADERS = ("Content-Type", "Link", "ETag", "Last-Modified")
+
+
+def normalize_url(url: str, params: dict | None = None) -> str:
+    """
+    Merges params into the URL's query string and sorts it, so equivalent requests share a key.
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query.extend((key, str(value)) for key, value in params.items() if value is not None)
+
+    return urlunsplit(parts._replace(query=urlencode(sorted(query)), fragment=""))
+
+
+class CachedResponse:
+    """
+    A cache entry, as stored on disk.
+
+    Attributes:
+        path: File holding the entry.
+        data: The entry's content: url, status, headers, body and stored_at.
+        ttl: Number of seconds the entry stays fresh.
+    """
+
+    def __init__(self, path: Path, data: dict, ttl: float):
+        self.path = path
+        self.data = data
+        self.ttl = ttl
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() - self.data["stored_at"] < self.ttl
+
+    def conditional_headers(self) -> dict:
+        """
+        Headers asking the server to answer 304 if the entry is still valid.
+        """
+        headers = {}
+        etag = self.data["headers"].get("ETag")
+        last_modified = self.data["headers"].get("Last-Modified")
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        return headers
+
+    def to_response(self) -> requests.Response:
+        response = requests.Response()
+        response.status_code = self.data["status"]
+        response.url = self.data["url"]
+        response.headers = CaseInsensitiveDict(self.data["headers"])
+        response.encoding = "utf-8"
+        response._content = self.data["body"].encode("utf-8")
+        response.from_cache = True
+
+        return response
+
+
+class ResponseCache:
+    """
+    File-per-entry response cache with per-endpoint TTLs and LRU eviction.
+
+    Endpoints are matched with shell-style patterns against the URL path, minus its API version, such as "cursus/*/projects". Endpoints without a TTL are never cached.
+
+    The size of the cache is scanned from disk on the first store, then kept as a running total; the directory is only scanned again when that total crosses the cap, and eviction then goes down to EVICTION_TARGET of the cap so the next scan is some stores away.
+
+    Attributes:
+        directory: Directory holding the entries.
+        ttls: Mapping of endpoint patterns to their TTL, in seconds.
+        max_bytes: Size cap of the cache; least recently used entries are evicted past it.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path = DEFAULT_CACHE_DIR,
+        ttls: dict | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.directory = Path(directory)
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_bytes = max_bytes
+        self._logger = logging.getLogger("RESPONSE_CACHE")
+        self._size: int | None = None
+        self._size_lock = threading.Lock()
+
+    def ttl_for(self, url: str) -> float | None:
+        """
+        Finds the TTL of the endpoint a URL points to.
+
+        Returns:
+            The TTL in seconds, or None when the endpoint isn't cached.
+        """
+        endpoint = endpoint_from_url(url)
+        for pattern, ttl in self.ttls.items():
+            if fnmatch(endpoint, pattern):
+                return ttl
+
+        return None
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+    def lookup(self, url: str, params: dict | None = None) -> CachedResponse | None:
+        """
+        Finds the cached response of a request, fresh or stale.
+
+        Returns:
+            The entry, or None on a miss or when the endpoint isn't cached.
+        """
+        ttl = self.ttl_for(url)
+        if ttl is None:
+            return None
+
+        path = self._entry_path(normalize_url(url, params))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return CachedResponse(path, data, ttl)
+
+    def store(
+        self, url: str, params: dict | None, response: requests.Response
+    ) -> None:
+        """
+        Caches a successful response, if its endpoint has a TTL.
+        """
+        if response.status_code != 200 or self.ttl_for(url) is None:
+            return
+
+        key = normalize_url(url, params)
+        data = {
+            "url": key,
+            "status": response.status_code,
+            "headers": {
+                name: response.headers[name]
+                for name in CACHED_HEADERS
+                if name in response.headers
+            },
+            "body": response.content.decode("utf-8"),
+            "stored_at": time.time(),
+        }
+        size = self._write(self._entry_path(key), data)
+
+        with self._size_lock:
+            if self._size is not None and self._size + size <= self.max_bytes:
+                self._size += size
+                return
+
+            self._evict()
+
+    def refresh(self, entry: CachedResponse) -> None:
+        """
+        Marks an entry as fresh again after the server confirmed it with a 304.
+        """
+        entry.data["stored_at"] = time.time()
+        self._write(entry.path, entry.data)
+
+    def _write(self, path: Path, data: dict) -> int:
+        """
+        Writes an entry atomically.
+
+        Returns:
+            The size of the entry, in bytes.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = tmp_path_for(path)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        size = tmp_path.stat().st_size
+        os.replace(tmp_path, path)
+
+        return size
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        target = self.max_bytes * EVICTION_TARGET if total > self.max_bytes else total
+        entries.sort()
+        for _, size, path in entries:
+            if total <= target:
+                break
+            self._logger.debug(f"Evicting {path.name} from the cache...")
+            path.unlink(missing_ok=True)
+            total -= size
+
+        self._size = total
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+        with self._size_lock:
+            self._size = 0
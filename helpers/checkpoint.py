@@ -0,0 +1,113 @@
+"""
+Checkpoint journal for long extractions. Each completed unit of work, a page or a batch of ids, is appended with its records, so a rerun after a crash replays them from disk and only requests what is left.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from urllib.parse import urlencode
+
+from helpers.models import to_jsonable
+
+DEFAULT_CHECKPOINT_DIR = "data/.checkpoints"
+
+
+def unit_key(endpoint: str, params: dict, page: int | None = None) -> str:
+    """
+    Builds the key of a unit of work from its endpoint, sorted params and page.
+    """
+    query = sorted(
+        (key, str(value))
+        for key, value in params.items()
+        if key != "page[number]" and value is not None
+    )
+    key = f"{endpoint}?{urlencode(query, safe='[],')}"
+    if page is not None:
+        key = f"{key}#page={page}"
+
+    return key
+
+
+class CheckpointJournal:
+    """
+    Append-only JSON lines journal of completed units and their records.
+
+    A fresh journal is started unless `resume` is True, in which case the units completed by a previous run are loaded. A line torn by a crash is ignored, so its unit is simply fetched again.
+
+    Example:
+        >>> journal = CheckpointJournal.for_job("piscine_projects", resume=True)
+        >>> if not journal.is_done(key):
+        ...     journal.record(key, fetch(key))
+        >>> journal.clear()  # Once the output is safely written.
+
+    Attributes:
+        path: Location of the journal.
+    """
+
+    def __init__(self, path: str | Path, resume: bool = False):
+        self.path = Path(path)
+        self._logger = logging.getLogger("CHECKPOINT")
+        self._units = {}
+
+        if resume and self.path.is_file():
+            self._load()
+            self._logger.info(
+                f"Resuming from {self.path}: {len(self._units)} units already done."
+            )
+        else:
+            self.path.unlink(missing_ok=True)
+
+    @classmethod
+    def for_job(
+        cls,
+        job_name: str,
+        resume: bool = False,
+        directory: str | Path = DEFAULT_CHECKPOINT_DIR,
+    ) -> "CheckpointJournal":
+        return cls(Path(directory) / f"{job_name}.jsonl", resume)
+
+    def _load(self) -> None:
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    self._logger.warning("Skipping a torn journal line...")
+                    continue
+                self._units[entry["unit"]] = entry["records"]
+
+    def __len__(self) -> int:
+        return len(self._units)
+
+    def is_done(self, key: str) -> bool:
+        return key in self._units
+
+    def results(self, key: str) -> list:
+        return self._units[key]
+
+    def record(self, key: str, records: list) -> None:
+        """
+        Marks a unit as done, durably writing its records before returning.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(
+                json.dumps(
+                    {"unit": key, "records": records},
+                    ensure_ascii=False,
+                    default=to_jsonable,
+                )
+            )
+            f.write("\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._units[key] = records
+
+    def clear(self) -> None:
+        """
+        Deletes the journal, once the job's output has been written.
+        """
+        self.path.unlink(missing_ok=True)
+        self._units = {}
@@ -0,0 +1,57 @@
+"""
+Process-wide setup shared by the clients and the scripts: the .env file is read once, logging is configured once, and settings are only read when first needed, so importing a module stays cheap.
+"""
+
+import logging
+import os
+import threading
+from functools import lru_cache
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_env = None
+_env_lock = threading.Lock()
+_logging_configured = False
+
+
+def get_env():
+    """
+    The `environs` reader, with the .env file loaded on first use.
+
+    `environs` is imported here rather than at module load, since it pulls in marshmallow and weighs more than the rest of the startup path.
+    """
+    global _env
+
+    if _env is None:
+        with _env_lock:
+            if _env is None:
+                from environs import env
+
+                env.read_env()
+                _env = env
+
+    return _env
+
+
+@lru_cache(maxsize=None)
+def api_url() -> str:
+    """
+    Base URL of the 42 API, from the REQ_URL setting.
+    """
+    return get_env().str("REQ_URL")
+
+
+def setup_logging(level: int | str | None = None) -> None:
+    """
+    Configures the root logger once per process; later calls are no-ops.
+
+    Args:
+        level: Logging level, LOG_LEVEL from the environment or INFO by default.
+    """
+    global _logging_configured
+
+    if _logging_configured:
+        return
+
+    logging.basicConfig(level=level or os.getenv("LOG_LEVEL", "INFO"), format=LOG_FORMAT)
+    _logging_configured = True
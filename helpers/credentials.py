@@ -0,0 +1,384 @@
+"""
+OAuth2 credentials of the 42 API applications a client authenticates with.
+
+The API enforces its rate limits per application, so each `Credential` keeps its own token lifecycle and rate-limit budget, and a `CredentialPool` spreads requests over several registered applications, sending each one to the application with the most budget left.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+
+import requests
+
+from helpers.rate_limit import RateLimiter
+from helpers.secrets import get_secrets
+from helpers.token_cache import TokenCache
+from helpers.tracing import span
+
+DEFAULT_TOKEN_SKEW = 60.0
+
+logger = logging.getLogger("FT_Client")
+
+
+def credential_keys(index: int) -> tuple[str, str]:
+    """
+    Names of the secrets holding the id and secret of the `index`-th application, counted from 1.
+
+    The first application keeps the historical CLIENT_ID/CLIENT_SECRET names, the next ones are suffixed: CLIENT_ID_2, CLIENT_SECRET_2...
+    """
+    if index == 1:
+        return "CLIENT_ID", "CLIENT_SECRET"
+    return f"CLIENT_ID_{index}", f"CLIENT_SECRET_{index}"
+
+
+class Credential:
+    """
+    One OAuth2 application, using the client credentials flow, with its own token and rate-limit budget.
+
+    Tokens are refreshed a `token_skew` before they expire, by a single thread at a time, and can be shared with other processes through a `TokenCache`. The session used to fetch them is passed on every call, so credentials can be shared between sessions.
+
+    Attributes:
+        name: Short identifier of the application for logs, derived from its client id.
+        rate_limiter: Limiter pacing the requests sent with this application's token.
+        requests: Number of requests sent with this application's token.
+        _client_id (str): The OAuth2 client ID (kept private).
+        _client_secret (str): The OAuth2 client secret (kept private).
+        _token_url (str): The endpoint URL for token requests.
+        _token_data (dict|None): Token and full token response from server.
+        _expires_in (float|None): Unix timestamp when the current token expires.
+    """
+
+    def __init__(
+        self,
+        token_url: str,
+        secret_keys: tuple[str, str] = ("CLIENT_ID", "CLIENT_SECRET"),
+        rate_limiter: RateLimiter | None = None,
+        token_skew: float = DEFAULT_TOKEN_SKEW,
+        token_cache: TokenCache | None = None,
+        secrets_ttl: float | None = None,
+    ):
+        """
+        Args:
+            token_url: The endpoint URL for token requests.
+            secret_keys: Names of the secrets holding the client id and the client secret.
+            rate_limiter: Limiter of the application, a new one is created by default.
+            token_skew: Seconds before expiry at which the token is refreshed ahead of time.
+            token_cache: On-disk token cache, to reuse a still-valid token fetched by another process.
+            secrets_ttl: Seconds the client id and secret are cached, so rotated ones are picked up at the next token fetch. Cached for the lifetime of the process when None.
+        """
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.requests = 0
+
+        self._token_url = token_url
+        self._secret_keys = secret_keys
+        self._token_skew = token_skew
+        self._token_cache = token_cache
+        self._secrets_ttl = secrets_ttl
+        self._token_data = None
+        self._expires_in = None
+        self._token_lock = threading.Lock()
+        self._async_token_lock = None
+        self._async_token_lock_loop = None
+
+        self._client_id = None
+        self._client_secret = None
+        self.name = None
+
+    def load_secrets(self, session=None) -> None:
+        """
+        Resolves the client id and secret, in parallel on Cloud Run, through the process-wide secrets cache.
+        """
+        client_id_key, client_secret_key = self._secret_keys
+        secrets = get_secrets(
+            [client_id_key, client_secret_key], session=session, ttl=self._secrets_ttl
+        )
+        self._client_id = secrets[client_id_key]
+        self._client_secret = secrets[client_secret_key]
+        self.name = hashlib.sha256(self._client_id.encode("utf-8")).hexdigest()[:8]
+
+    def auth_headers(self, session) -> dict:
+        return {"Authorization": f"Bearer {self.get_token(session)}"}
+
+    def get_token(self, session) -> str:
+        """
+        Retrieves a valid access token, refreshing it shortly before it expires.
+
+        Safe to call from several threads: only one of them refreshes the token.
+
+        Args:
+            session: `APISession` used to reach the token endpoint.
+
+        Returns:
+            str: The current valid access token.
+        """
+        if self._token_expired():
+            with self._token_lock:
+                if self._token_expired():
+                    self._log_refresh()
+                    self._refresh_token(session)
+        return self._token_data["token"]
+
+    async def get_token_async(self, client) -> str:
+        """
+        Same as `get_token`, without blocking the event loop. Concurrent tasks wait for a single refresh.
+
+        Args:
+            client: `AsyncFT_Client` used to reach the token endpoint.
+        """
+        if self._token_expired():
+            async with self._async_lock():
+                if self._token_expired():
+                    self._log_refresh()
+                    await self._refresh_token_async(client)
+        return self._token_data["token"]
+
+    def _async_lock(self) -> asyncio.Lock:
+        """
+        The lock of the async refreshes, created in the running event loop since an asyncio lock can't be shared across loops, such as consecutive `asyncio.run` calls.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_token_lock_loop is not loop:
+            self._async_token_lock = asyncio.Lock()
+            self._async_token_lock_loop = loop
+        return self._async_token_lock
+
+    def _token_expired(self) -> bool:
+        return not self._token_data or time.time() >= self._expires_in - self._token_skew
+
+    def _log_refresh(self) -> None:
+        # The first token of a run is expected, only an actual expiry is worth a warning.
+        if self._token_data is None:
+            logger.info("Fetching the first token...")
+        else:
+            logger.warning("Token expired or about to expire. Refreshing...")
+
+    def _is_stale(self, stale_token: str) -> bool:
+        return bool(self._token_data) and self._token_data["token"] == stale_token
+
+    def handle_unauthorized(self, stale_token: str, session) -> None:
+        """
+        Refreshes the token after the API rejected it with a 401, unless another thread already did.
+
+        Args:
+            stale_token: The rejected token.
+            session: `APISession` used to reach the token endpoint.
+        """
+        with self._token_lock:
+            if self._is_stale(stale_token):
+                logger.warning("Token rejected by the API. Refreshing...")
+                self._refresh_token(session, stale_token)
+
+    async def handle_unauthorized_async(self, stale_token: str, client) -> None:
+        """
+        Same as `handle_unauthorized`, for `AsyncFT_Client`.
+        """
+        async with self._async_lock():
+            if self._is_stale(stale_token):
+                logger.warning("Token rejected by the API. Refreshing...")
+                await self._refresh_token_async(client, stale_token)
+
+    def _refresh_token(self, session, stale_token: str | None = None) -> None:
+        """
+        Replaces the current token, reusing the on-disk cached one when it is still valid.
+
+        Args:
+            session: `APISession` used to reach the token endpoint.
+            stale_token: Token known to be rejected, never reused from the cache.
+        """
+        if self._client_id is None:
+            self.load_secrets(session)
+
+        if self._token_cache is None:
+            self._fetch_token(session)
+            return
+
+        with self._token_cache.locked():
+            if not self._load_cached_token(stale_token):
+                self._fetch_token(session)
+                self._token_cache.store(self._client_id, self._token_data, self._expires_in)
+
+    async def _refresh_token_async(self, client, stale_token: str | None = None) -> None:
+        """
+        Same as `_refresh_token`. The cache's file lock is taken in a worker thread, so waiting on another process doesn't block the event loop.
+        """
+        if self._client_id is None:
+            await asyncio.to_thread(self.load_secrets)
+
+        if self._token_cache is None:
+            await self._fetch_token_async(client)
+            return
+
+        lock = self._token_cache.locked()
+        await asyncio.to_thread(lock.__enter__)
+        try:
+            if not self._load_cached_token(stale_token):
+                await self._fetch_token_async(client)
+                self._token_cache.store(self._client_id, self._token_data, self._expires_in)
+        finally:
+            lock.__exit__(None, None, None)
+
+    def _load_cached_token(self, stale_token: str | None) -> bool:
+        """
+        Takes the token of the on-disk cache when it is valid long enough and isn't `stale_token`. The cache must be locked.
+
+        Returns:
+            Whether the cached token was taken.
+        """
+        cached = self._token_cache.load(self._client_id, min_ttl=self._token_skew)
+        if cached is None or cached["token"] == stale_token:
+            return False
+
+        logger.info("Reusing cached token.")
+        self._token_data = {
+            "token": cached["token"],
+            "metadata": cached["metadata"],
+        }
+        self._expires_in = cached["expires_at"]
+        return True
+
+    def _token_request(self) -> dict:
+        """
+        Arguments of the client credentials request to the token endpoint.
+        """
+        return {
+            "data": {
+                "grant_type": "client_credentials",
+                "client_id": self._client_id,
+                "client_secret": self._client_secret,
+            },
+            "headers": {"Content-Type": "application/x-www-form-urlencoded"},
+            "authenticate": False,
+            "rate_limited": False,
+        }
+
+    def _set_token(self, token_info: dict) -> None:
+        self._token_data = {
+            "token": token_info["access_token"],
+            "metadata": token_info,
+        }
+
+        self._expires_in = time.time() + token_info["expires_in"]
+        logger.info(
+            f"Successfully fetched new token for application {self.name}. "
+            f"Expires in {token_info['expires_in']} seconds."
+        )
+
+    def _fetch_token(self, session) -> None:
+        """
+        Fetches a new access token from the OAuth2 server and stores it.
+
+        Uses client credentials flow with application/x-www-form-urlencoded content type.
+        Updates both the token data and expiration timestamp.
+
+        Raises:
+            requests.HTTPError: If the token request fails (4xx/5xx status).
+            ValueError: If the token response is malformed.
+        """
+        try:
+            self.load_secrets(session)
+
+            logger.debug(f"Requesting new token from {self._token_url}")
+            with span("token_fetch", "auth", application=self.name):
+                response = session.post(self._token_url, **self._token_request())
+                response.raise_for_status()
+
+            self._set_token(response.json())
+        except requests.RequestException as e:
+            logger.error(f"Token fetch failed: {str(e)}", exc_info=True)
+            raise
+
+    async def _fetch_token_async(self, client) -> None:
+        """
+        Same as `_fetch_token`, through `AsyncFT_Client`.
+
+        Raises:
+            httpx.HTTPStatusError: If the token request fails (4xx/5xx status).
+        """
+        try:
+            await asyncio.to_thread(self.load_secrets)
+
+            logger.debug(f"Requesting new token from {self._token_url}")
+            with span("token_fetch", "auth", application=self.name):
+                response = await client.request("POST", self._token_url, **self._token_request())
+                response.raise_for_status()
+
+            self._set_token(response.json())
+        except Exception as e:
+            logger.error(f"Token fetch failed: {str(e)}", exc_info=True)
+            raise
+
+
+class CredentialPool:
+    """
+    Several applications used together, multiplying the rate-limit budget.
+
+    Every request goes to the application that can send it the soonest and, among those, the one with the most hourly budget left. Applications held back by a 429 or out of hourly budget are skipped until they recover.
+
+    Attributes:
+        credentials: The applications of the pool; the first one is the primary.
+    """
+
+    def __init__(self, credentials: list[Credential]):
+        if not credentials:
+            raise ValueError("A credential pool needs at least one credential.")
+
+        self.credentials = list(credentials)
+        self._lock = threading.Lock()
+
+    @property
+    def primary(self) -> Credential:
+        return self.credentials[0]
+
+    def __len__(self) -> int:
+        return len(self.credentials)
+
+    def __iter__(self):
+        return iter(self.credentials)
+
+    def acquire(self) -> Credential:
+        """
+        Picks the application for the next request and waits for its budget.
+
+        The choice and the reservation are made under one lock, so concurrent threads spread over the applications instead of all picking the same one.
+
+        Returns:
+            The application to authenticate the request with.
+        """
+        credential, delay = self._reserve()
+        credential.rate_limiter.wait(delay)
+        return credential
+
+    async def acquire_async(self) -> Credential:
+        """
+        Same as `acquire`, without blocking the event loop.
+        """
+        credential, delay = self._reserve()
+        await credential.rate_limiter.wait_async(delay)
+        return credential
+
+    def _reserve(self) -> tuple[Credential, float]:
+        with self._lock:
+            credential = min(
+                self.credentials,
+                key=lambda c: (round(c.rate_limiter.available_in(), 3), -c.rate_limiter.budget),
+            )
+            delay = credential.rate_limiter.reserve()
+            credential.requests += 1
+
+        return credential, delay
+
+    def summary(self) -> dict:
+        """
+        Requests and rate-limit state per application, to check the load is spread evenly.
+        """
+        return {
+            credential.name: {
+                "requests": credential.requests,
+                "hourly_remaining": credential.rate_limiter.hourly_remaining,
+                "available_in": round(credential.rate_limiter.available_in(), 3),
+                "total_wait": round(credential.rate_limiter.total_wait, 3),
+            }
+            for credential in self.credentials
+        }
@@ -0,0 +1,274 @@
+"""
+Declarative job graph for the extraction scripts: each job names the datasets it reads and writes, and independent jobs run concurrently on one shared extractor, so they share its rate budget and connection pool.
+
+A full refresh then takes as long as its critical path instead of the sum of its steps:
+
+    >>> graph = JobGraph()
+    >>> graph.add("campus", extract_campus, outputs=["campus_data"])
+    >>> graph.add("users", extract_users, inputs=["campus_data"], outputs=["users"])
+    >>> report = graph.run(extractor, max_workers=4)
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterable
+
+from helpers.metrics import extraction
+from helpers.tracing import span
+
+DEFAULT_MAX_JOBS = 4
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class Job:
+    """
+    A step of the graph.
+
+    Attributes:
+        name: Unique name of the job.
+        func: Callable receiving the shared extractor.
+        inputs: Datasets the job reads, produced by other jobs or already on disk.
+        outputs: Datasets the job writes.
+        after: Jobs that must finish first, on top of the producers of `inputs`.
+        status: One of "pending", "done", "failed" or "skipped".
+        started_at: Start of the job, in seconds since the start of the run.
+        duration: Duration of the job, in seconds.
+        error: Exception raised by the job, if it failed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        inputs: Iterable[str] = (),
+        outputs: Iterable[str] = (),
+        after: Iterable[str] = (),
+    ):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.after = tuple(after)
+        self.status = PENDING
+        self.started_at = None
+        self.duration = None
+        self.error = None
+
+
+class JobReport:
+    """
+    Outcome and timings of a run.
+
+    Attributes:
+        jobs: The jobs of the graph, in the order they were added.
+        wall_time: Duration of the whole run, in seconds.
+        critical_path: Names of the chain of dependent jobs that took the longest.
+    """
+
+    def __init__(self, jobs: list[Job], wall_time: float, critical_path: list[str]):
+        self.jobs = jobs
+        self.wall_time = wall_time
+        self.critical_path = critical_path
+
+    @property
+    def ok(self) -> bool:
+        return all(job.status == DONE for job in self.jobs)
+
+    @property
+    def failed(self) -> list[Job]:
+        return [job for job in self.jobs if job.status == FAILED]
+
+    @property
+    def serial_time(self) -> float:
+        """
+        Time the jobs would have taken one after another.
+        """
+        return sum(job.duration or 0.0 for job in self.jobs)
+
+    def summary(self) -> dict:
+        return {
+            "wall_time": round(self.wall_time, 3),
+            "serial_time": round(self.serial_time, 3),
+            "critical_path": self.critical_path,
+            "jobs": {
+                job.name: {
+                    "status": job.status,
+                    "started_at": None if job.started_at is None else round(job.started_at, 3),
+                    "duration": None if job.duration is None else round(job.duration, 3),
+                    "error": None if job.error is None else repr(job.error),
+                }
+                for job in self.jobs
+            },
+        }
+
+
+class JobGraph:
+    """
+    A set of jobs linked by the datasets they exchange.
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self._producers = {}
+        self._logger = logging.getLogger("JOB_GRAPH")
+
+    def add(
+        self,
+        name: str,
+        func: Callable,
+        inputs: Iterable[str] = (),
+        outputs: Iterable[str] = (),
+        after: Iterable[str] = (),
+    ) -> Job:
+        """
+        Adds a job to the graph.
+
+        Raises:
+            ValueError: If the name is taken, or an output is already produced by another job.
+        """
+        if name in self.jobs:
+            raise ValueError(f"Job '{name}' is already defined.")
+
+        job = Job(name, func, inputs, outputs, after)
+        for output in job.outputs:
+            if output in self._producers:
+                raise ValueError(
+                    f"Dataset '{output}' is produced by both '{self._producers[output]}' and '{name}'."
+                )
+            self._producers[output] = name
+
+        self.jobs[name] = job
+        return job
+
+    def dependencies(self, name: str) -> set[str]:
+        """
+        Jobs that must finish before `name` starts. Inputs nobody produces are expected on disk already.
+
+        Raises:
+            ValueError: If `after` names an unknown job.
+        """
+        job = self.jobs[name]
+        dependencies = {self._producers[i] for i in job.inputs if i in self._producers}
+        for other in job.after:
+            if other not in self.jobs:
+                raise ValueError(f"Job '{name}' runs after unknown job '{other}'.")
+            dependencies.add(other)
+
+        dependencies.discard(name)
+        return dependencies
+
+    def order(self) -> list[str]:
+        """
+        Sorts the jobs so every job comes after its dependencies.
+
+        Raises:
+            ValueError: If the graph has a cycle.
+        """
+        remaining = {name: self.dependencies(name) for name in self.jobs}
+        ordered = []
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Cycle between jobs: {', '.join(sorted(remaining))}.")
+            for name in ready:
+                del remaining[name]
+                ordered.append(name)
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+        return ordered
+
+    def critical_path(self) -> list[str]:
+        """
+        The chain of dependent jobs with the longest total duration, from the last run.
+        """
+        longest = {}
+        previous = {}
+        for name in self.order():
+            deps = self.dependencies(name)
+            before = max(deps, key=lambda dep: longest[dep], default=None)
+            longest[name] = (self.jobs[name].duration or 0.0) + (longest[before] if before else 0.0)
+            previous[name] = before
+
+        path = []
+        name = max(longest, key=longest.get, default=None)
+        while name is not None:
+            path.append(name)
+            name = previous[name]
+
+        return path[::-1]
+
+    def run(self, context, max_workers: int = DEFAULT_MAX_JOBS) -> JobReport:
+        """
+        Runs every job as soon as its dependencies are done, up to `max_workers` at a time.
+
+        A failed job doesn't stop the others, but the jobs depending on it are skipped. The requests of each job are labelled with its name in the client metrics.
+
+        Args:
+            context: Object handed to every job, usually the shared `FT_Extractor`.
+            max_workers: Maximum number of jobs running at the same time.
+
+        Returns:
+            The report of the run, also logged.
+
+        Raises:
+            ValueError: If the graph has a cycle.
+        """
+        order = self.order()
+        waiting = {name: self.dependencies(name) for name in order}
+        for job in self.jobs.values():
+            job.status, job.started_at, job.duration, job.error = PENDING, None, None, None
+
+        start = time.perf_counter()
+        running: dict[Future, Job] = {}
+
+        def timed(job: Job) -> None:
+            job.started_at = time.perf_counter() - start
+            try:
+                with extraction(job.name), span(job.name, "job"):
+                    job.func(context)
+            finally:
+                job.duration = time.perf_counter() - start - job.started_at
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job") as executor:
+            while waiting or running:
+                for name in [name for name in order if name in waiting]:
+                    deps = waiting[name]
+                    if any(self.jobs[dep].status in (FAILED, SKIPPED) for dep in deps):
+                        self._logger.warning(f"Skipping job '{name}': a dependency failed.")
+                        self.jobs[name].status = SKIPPED
+                        del waiting[name]
+                    elif all(self.jobs[dep].status == DONE for dep in deps):
+                        self._logger.info(f"Starting job '{name}'...")
+                        running[executor.submit(timed, self.jobs[name])] = self.jobs[name]
+                        del waiting[name]
+
+                if not running:
+                    continue
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    job = running.pop(future)
+                    job.error = future.exception()
+                    if job.error is None:
+                        job.status = DONE
+                        self._logger.info(f"Job '{job.name}' done in {job.duration:.2f}s.")
+                    else:
+                        job.status = FAILED
+                        self._logger.error(
+                            f"Job '{job.name}' failed after {job.duration:.2f}s: {job.error!r}",
+                            exc_info=job.error,
+                        )
+
+        report = JobReport(list(self.jobs.values()), time.perf_counter() - start, self.critical_path())
+        self._logger.info(
+            f"Ran {len(report.jobs)} jobs in {report.wall_time:.2f}s "
+            f"({report.serial_time:.2f}s one after another). "
+            f"Critical path: {' -> '.join(report.critical_path)}."
+        )
+        return report
@@ -0,0 +1,387 @@
+"""
+Request metrics of the clients, to know where the hours of an extraction go.
+
+Every request sent through a client is recorded with its endpoint, status, network latency, response size, rate-limit wait, backoff and retry count, and every decoded page with its number of items. Samples are aggregated into counters and histograms per endpoint and per extraction, printed as a summary at the end of a run, and exported as JSON or Prometheus text:
+
+    >>> with extraction("piscine_2025_users"):
+    ...     extractor.basic_extraction("users")
+    >>> print(extractor.metrics.summary())
+    >>> extractor.metrics.write("data/metrics.prom")
+"""
+
+import bisect
+import contextvars
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from helpers.pagination import endpoint_from_url
+
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+NUMERIC_SEGMENT = re.compile(r"(^|/)\d+(?=/|$)")
+
+_extraction = contextvars.ContextVar("extraction", default=None)
+
+
+def endpoint_label(url: str) -> str:
+    """
+    Endpoint a URL points to, with its ids replaced so every user's requests share a label, such as "users/{id}/projects_users".
+    """
+    return NUMERIC_SEGMENT.sub(r"\1{id}", endpoint_from_url(url))
+
+
+@contextmanager
+def extraction(name: str):
+    """
+    Labels the requests sent within the block, from this thread or the tasks and workers it starts, with an extraction name.
+
+    Nested blocks keep the outermost name, so the requests of a job are labelled after the job whatever extractions it runs.
+    """
+    if _extraction.get() is not None:
+        yield
+        return
+
+    token = _extraction.set(name)
+    try:
+        yield
+    finally:
+        _extraction.reset(token)
+
+
+def current_extraction() -> str | None:
+    return _extraction.get()
+
+
+@dataclass
+class RequestSample:
+    """
+    What one request cost, from its first attempt to its last.
+
+    Attributes:
+        method: HTTP method of the request.
+        url: URL of the request.
+        status: Final status code, or the name of the exception the request failed with.
+        latency: Seconds spent on the network, over every attempt.
+        wait: Seconds spent waiting for the rate-limit budget, over every attempt.
+        backoff: Seconds spent sleeping between attempts.
+        retries: Number of attempts after the first one, 401 replays included.
+        size: Size of the response body, in bytes.
+        cached: Whether the response was served from the cache without touching the API.
+    """
+
+    method: str
+    url: str
+    status: int | str | None = None
+    latency: float = 0.0
+    wait: float = 0.0
+    backoff: float = 0.0
+    retries: int = 0
+    size: int = 0
+    cached: bool = False
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram, as Prometheus exposes them.
+    """
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other: "Histogram") -> None:
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+    def quantile(self, q: float) -> float | None:
+        """
+        Estimates a quantile by linear interpolation within its bucket, the last bound standing for values above it.
+        """
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        pairs = []
+        total = 0
+        for bound, count in zip([*self.buckets, "+Inf"], self.counts):
+            total += count
+            pairs.append((str(bound), total))
+        return pairs
+
+    def to_dict(self) -> dict:
+        return {
+            "buckets": dict(self.cumulative()),
+            "sum": round(self.sum, 6),
+            "count": self.count,
+        }
+
+
+class Series:
+    """
+    Aggregated metrics of the requests sharing an extraction and an endpoint.
+    """
+
+    def __init__(self):
+        self.statuses = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.wait = 0.0
+        self.backoff = 0.0
+        self.retries = 0
+        self.items = 0
+        self.cache_hits = 0
+
+    @property
+    def requests(self) -> int:
+        return sum(self.statuses.values())
+
+    @property
+    def errors(self) -> int:
+        return sum(
+            count
+            for status, count in self.statuses.items()
+            if not (isinstance(status, int) and status < 400)
+        )
+
+    def add(self, sample: RequestSample) -> None:
+        if sample.cached:
+            self.cache_hits += 1
+            return
+
+        self.statuses[sample.status] = self.statuses.get(sample.status, 0) + 1
+        self.latency.observe(sample.latency)
+        self.size.observe(sample.size)
+        self.wait += sample.wait
+        self.backoff += sample.backoff
+        self.retries += sample.retries
+
+    def merge(self, other: "Series") -> None:
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        self.latency.merge(other.latency)
+        self.size.merge(other.size)
+        self.wait += other.wait
+        self.backoff += other.backoff
+        self.retries += other.retries
+        self.items += other.items
+        self.cache_hits += other.cache_hits
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "retries": self.retries,
+            "items": self.items,
+            "cache_hits": self.cache_hits,
+            "bytes": int(self.size.sum),
+            "network_time": round(self.latency.sum, 6),
+            "rate_limit_wait": round(self.wait, 6),
+            "backoff": round(self.backoff, 6),
+            "latency": {
+                "p50": self.latency.quantile(0.5),
+                "p95": self.latency.quantile(0.95),
+                "p99": self.latency.quantile(0.99),
+                "histogram": self.latency.to_dict(),
+            },
+            "size": self.size.to_dict(),
+        }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+
+
+class Metrics:
+    """
+    Thread-safe registry of the request metrics of a run.
+
+    Attributes:
+        started_at: Monotonic time the run started at, the registry's creation or last reset.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+        self.started_at = time.monotonic()
+
+    def _get_series(self, endpoint: str) -> Series:
+        key = (current_extraction() or "", endpoint)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = Series()
+        return series
+
+    def record(self, sample: RequestSample) -> None:
+        """
+        Adds a request to the series of its endpoint and of the current extraction.
+        """
+        endpoint = endpoint_label(sample.url)
+        with self._lock:
+            self._get_series(endpoint).add(sample)
+
+    def add_items(self, url: str, count: int) -> None:
+        """
+        Counts the items of a page decoded from a response of `url`.
+        """
+        endpoint = endpoint_label(url)
+        with self._lock:
+            self._get_series(endpoint).items += count
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+            self.started_at = time.monotonic()
+
+    def _grouped(self, index: int) -> dict[str, Series]:
+        grouped = {}
+        with self._lock:
+            for key, series in self._series.items():
+                grouped.setdefault(key[index], Series()).merge(series)
+        return dict(sorted(grouped.items()))
+
+    def by_extraction(self) -> dict[str, Series]:
+        """
+        Series merged per extraction, requests sent outside of any extraction being under "".
+        """
+        return self._grouped(0)
+
+    def by_endpoint(self) -> dict[str, Series]:
+        return self._grouped(1)
+
+    def totals(self) -> Series:
+        total = Series()
+        with self._lock:
+            for series in self._series.values():
+                total.merge(series)
+        return total
+
+    def to_dict(self) -> dict:
+        return {
+            "elapsed": round(time.monotonic() - self.started_at, 3),
+            "totals": self.totals().to_dict(),
+            "extractions": {name: series.to_dict() for name, series in self.by_extraction().items()},
+            "endpoints": {name: series.to_dict() for name, series in self.by_endpoint().items()},
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format, labelled by extraction and endpoint.
+        """
+        with self._lock:
+            series = sorted(self._series.items())
+
+        lines = []
+
+        def family(name: str, kind: str, description: str) -> None:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        family("ft_requests_total", "counter", "Requests sent to the 42 API.")
+        for (extraction_name, endpoint), values in series:
+            for status, count in values.statuses.items():
+                labels = _labels(extraction=extraction_name, endpoint=endpoint, status=status)
+                lines.append(f"ft_requests_total{{{labels}}} {count}")
+
+        counters = [
+            ("ft_retries_total", "Retried attempts, 401 replays included.", lambda values: values.retries),
+            ("ft_items_total", "Items decoded from the responses.", lambda values: values.items),
+            ("ft_cache_hits_total", "Requests answered by the response cache.", lambda values: values.cache_hits),
+            ("ft_rate_limit_wait_seconds_total", "Seconds spent waiting for the rate-limit budget.", lambda values: values.wait),
+            ("ft_retry_backoff_seconds_total", "Seconds spent sleeping between attempts.", lambda values: values.backoff),
+        ]
+        for name, description, value in counters:
+            family(name, "counter", description)
+            for (extraction_name, endpoint), values in series:
+                labels = _labels(extraction=extraction_name, endpoint=endpoint)
+                lines.append(f"{name}{{{labels}}} {value(values)}")
+
+        histograms = [
+            ("ft_request_duration_seconds", "Network time of the requests, over every attempt.", lambda values: values.latency),
+            ("ft_response_size_bytes", "Size of the response bodies.", lambda values: values.size),
+        ]
+        for name, description, histogram in histograms:
+            family(name, "histogram", description)
+            for (extraction_name, endpoint), values in series:
+                labels = _labels(extraction=extraction_name, endpoint=endpoint)
+                for bound, count in histogram(values).cumulative():
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram(values).sum}")
+                lines.append(f"{name}_count{{{labels}}} {histogram(values).count}")
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """
+        Human-readable tables of the run, per extraction and per endpoint, followed by the totals.
+        """
+        header = (
+            f"{'':<32} {'requests':>8} {'errors':>6} {'retries':>7} {'items':>8} {'MB':>7} "
+            f"{'network':>9} {'waiting':>9} {'backoff':>9} {'p50 ms':>7} {'p95 ms':>7}"
+        )
+
+        def row(name: str, series: Series) -> str:
+            p50 = series.latency.quantile(0.5)
+            p95 = series.latency.quantile(0.95)
+            return (
+                f"{name[:32]:<32} {series.requests:>8} {series.errors:>6} {series.retries:>7} "
+                f"{series.items:>8} {series.size.sum / 2**20:>7.2f} {series.latency.sum:>8.1f}s "
+                f"{series.wait:>8.1f}s {series.backoff:>8.1f}s "
+                f"{'-' if p50 is None else round(p50 * 1000):>7} {'-' if p95 is None else round(p95 * 1000):>7}"
+            )
+
+        lines = ["Requests per extraction:", header]
+        lines += [row(name or "(none)", series) for name, series in self.by_extraction().items()]
+        lines += ["", "Requests per endpoint:", header]
+        lines += [row(name, series) for name, series in self.by_endpoint().items()]
+
+        total = self.totals()
+        elapsed = time.monotonic() - self.started_at
+        lines += [
+            "",
+            f"{total.requests} requests ({total.errors} errors, {total.retries} retries, {total.cache_hits} cache hits) "
+            f"returned {total.items} items and {total.size.sum / 2**20:.2f} MB in {elapsed:.1f}s: "
+            f"{total.latency.sum:.1f}s on the network, {total.wait:.1f}s waiting for the rate limit, "
+            f"{total.backoff:.1f}s backing off.",
+        ]
+        return "\n".join(lines)
+
+    def write(self, path: str | Path) -> None:
+        """
+        Exports the metrics to a file, as JSON when its name ends with ".json" and as Prometheus text otherwise.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".json":
+            path.write_text(json.dumps(self.to_dict(), indent=4), encoding="utf-8")
+        else:
+            path.write_text(self.to_prometheus(), encoding="utf-8")
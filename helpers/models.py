@@ -0,0 +1,172 @@
+"""
+Compact, typed record models for the API resources the reports use.
+
+The API returns large nested payloads (images, achievements, cursus_users...) of which a report needs a dozen fields. A model keeps only those fields, in `__slots__` instead of a per-record dict, and is built while each page is decoded, so the rest of the payload is dropped right away.
+
+    >>> users = extractor.basic_extraction("users", model=User)
+    >>> users[0].login
+"""
+
+from typing import Callable, Iterable
+
+from helpers.projection import get_path, project
+
+
+class Record:
+    """
+    Base of the record models.
+
+    Subclasses list their fields in `FIELDS`, mapping each attribute to its dotted path in the API payload, and declare the same names in `__slots__`.
+
+    Records also answer `record["id"]` and `record.get("id")`, so code written for dicts keeps working.
+    """
+
+    __slots__ = ()
+    FIELDS: dict[str, str] = {}
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+    @classmethod
+    def from_api(cls, data: dict) -> "Record":
+        """
+        Builds a record from an API payload, ignoring every field the model doesn't list.
+        """
+        record = cls.__new__(cls)
+        for name, path in cls.FIELDS.items():
+            setattr(record, name, get_path(data, path))
+
+        return record
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Record":
+        """
+        Builds a record back from the output of `to_dict`, as saved to disk.
+        """
+        return cls(**data)
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __getitem__(self, name: str):
+        if name not in self.FIELDS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def get(self, name: str, default=None):
+        return getattr(self, name, default) if name in self.FIELDS else default
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class User(Record):
+    FIELDS = {
+        "id": "id",
+        "login": "login",
+        "email": "email",
+        "usual_full_name": "usual_full_name",
+        "kind": "kind",
+        "pool_month": "pool_month",
+        "pool_year": "pool_year",
+        "staff": "staff?",
+        "alumni": "alumni?",
+        "active": "active?",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    }
+    __slots__ = tuple(FIELDS)
+
+
+class ProjectUser(Record):
+    FIELDS = {
+        "id": "id",
+        "user_id": "user.id",
+        "user_login": "user.login",
+        "project_id": "project.id",
+        "project_slug": "project.slug",
+        "cursus_ids": "cursus_ids",
+        "occurrence": "occurrence",
+        "final_mark": "final_mark",
+        "status": "status",
+        "validated": "validated?",
+        "marked": "marked",
+        "marked_at": "marked_at",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    }
+    __slots__ = tuple(FIELDS)
+
+
+class Project(Record):
+    FIELDS = {
+        "id": "id",
+        "name": "name",
+        "slug": "slug",
+        "parent_id": "parent.id",
+        "exam": "exam",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    }
+    __slots__ = tuple(FIELDS)
+
+
+class Campus(Record):
+    FIELDS = {
+        "id": "id",
+        "name": "name",
+        "city": "city",
+        "country": "country",
+        "time_zone": "time_zone",
+        "users_count": "users_count",
+        "active": "active",
+        "public": "public",
+    }
+    __slots__ = tuple(FIELDS)
+
+
+class Cursus(Record):
+    FIELDS = {
+        "id": "id",
+        "name": "name",
+        "slug": "slug",
+        "kind": "kind",
+        "created_at": "created_at",
+    }
+    __slots__ = tuple(FIELDS)
+
+
+def make_shaper(
+    fields: Iterable[str] | None = None,
+    model: type[Record] | None = None,
+) -> Callable[[dict], object] | None:
+    """
+    Builds the function applied to each decoded item: a model, a projection to dotted `fields`, or nothing.
+
+    Raises:
+        ValueError: If both a model and fields are given.
+    """
+    if model is not None and fields is not None:
+        raise ValueError("Pass either a model or fields to project, not both.")
+    if model is not None:
+        return model.from_api
+    if fields is not None:
+        fields = list(fields)
+        return lambda item: project(item, fields)
+
+    return None
+
+
+def to_jsonable(value):
+    """
+    `default` hook of the JSON encoders, serializing records as dicts.
+    """
+    if isinstance(value, Record):
+        return value.to_dict()
+
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,397 @@
+"""
+Pagination helpers shared by the extractors: query params building, the `Link` header parsing used to find the last page of a resource, the params of keyset (id-range) pagination, and the `Paginator` engine walking the pages of a resource through a pooled session.
+"""
+
+import contextvars
+import logging
+import re
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
+from urllib.parse import urlsplit
+
+from helpers.codec import loads
+from helpers.models import Record, make_shaper
+from helpers.tracing import span
+
+if TYPE_CHECKING:
+    from helpers.session import APISession
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 100
+
+KEYSET_MAX_ID = 2**31 - 1
+
+API_VERSION_PREFIX = re.compile(r"^/v\d+/")
+
+LAST_PAGE_PATTERN = re.compile(
+    r'<[^>]*[?&]page(?:\[number\]|%5Bnumber%5D)?=(\d+)[^>]*>;\s*rel="last"'
+)
+
+
+def build_params(page_size: int = DEFAULT_PAGE_SIZE, page: int = 1, **kwargs) -> dict:
+    """
+    Builds the query params for a paginated request.
+
+    Args:
+        page_size: Number of items per page. Sizes above 100, the maximum accepted by the API, are lowered to it, since the API would silently cap them.
+        page: Page number to start from.
+        **kwargs: Extra params, such as "filter[pool_year]". The ones with a None value are dropped.
+
+    Returns:
+        The params dictionary, ready to be sent with the request.
+    """
+    params = {"page[number]": page, "page[size]": min(page_size, MAX_PAGE_SIZE)}
+    for key, value in kwargs.items():
+        if value is not None:
+            params[key] = value
+
+    return params
+
+
+def keyset_params(params: dict, after_id: int | None = None) -> dict:
+    """
+    Builds the params of a keyset page: the first page of the items sorted by id, restricted to ids greater than `after_id`.
+
+    Unlike `page[number]` offsets, the API finds such a page through the id index however deep the extraction goes, and records created or deleted meanwhile can't shift items across pages.
+
+    Args:
+        params: Params of the extraction, as built by `build_params`.
+        after_id: Greatest id already extracted, None to start from the beginning.
+
+    Returns:
+        A new params dictionary.
+    """
+    lower = 0 if after_id is None else after_id + 1
+    return {
+        **params,
+        "page[number]": 1,
+        "sort": "id",
+        "range[id]": f"{lower},{KEYSET_MAX_ID}",
+    }
+
+
+def parse_last_page(link_header: str | None, logger: logging.Logger) -> int:
+    """
+    Reads the last page number from a response's `Link` header.
+
+    Args:
+        link_header: Value of the `Link` header, if the response had one.
+        logger: Logger used to report what was found.
+
+    Returns:
+        The last page number, 1 when the header is missing or has no "last" relation.
+    """
+    if not link_header:
+        logger.warning("No Link header. Assuming only one page.")
+        return 1
+
+    logger.info(f"Link header found: {link_header}")
+    match = LAST_PAGE_PATTERN.search(link_header)
+    if match:
+        last_page = int(match.group(1))
+        logger.info(f"I've found {last_page} pages!")
+        return last_page
+
+    logger.info("No 'last' relation found in Link header. Assuming single page.")
+    return 1
+
+
+def endpoint_from_url(url: str) -> str:
+    """
+    Extracts the endpoint a URL points to, without the API version, such as "cursus/9/projects".
+    """
+    return API_VERSION_PREFIX.sub("", urlsplit(url).path).strip("/")
+
+
+class Paginator:
+    """
+    Walks the pages of the API's resources through a pooled, rate-limited `APISession`.
+
+    It is the pagination engine of `FT_Extractor` and of the `helpers.utils` functions, so both page the same way: the first page doubles as the `Link` probe, the remaining pages can be fetched by a bounded worker pool, and keyset pagination is available for deep extractions.
+
+    Example:
+        >>> paginator = Paginator(session, api_url(), headers={"Authorization": f"Bearer {token}"})
+        >>> users = list(paginator.iter_items("users", **{"filter[pool_year]": 2025}))
+
+    Attributes:
+        session: Session every page is requested through.
+        base_url: API base URL the endpoints are relative to.
+        max_workers: Default number of pages fetched concurrently once the page count is known.
+        keyset: Whether items are paginated by id range instead of page number by default.
+        headers: Extra headers sent with every page, such as an Authorization header when the session has no credentials.
+    """
+
+    def __init__(
+        self,
+        session: "APISession",
+        base_url: str,
+        max_workers: int = 1,
+        keyset: bool = False,
+        headers: dict | None = None,
+        logger: logging.Logger | None = None,
+    ):
+        self.session = session
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.keyset = keyset
+        self.headers = headers
+        self._logger = logger or logging.getLogger("PAGINATOR")
+
+    def _get(self, request_url: str, params: dict):
+        response = self.session.get(request_url, params=params, headers=self.headers)
+        response.raise_for_status()
+        return response
+
+    def get_pages(self, endpoint: str, params: dict) -> int:
+        """
+        Requests the page given by `params` only to read the last page number of the resource.
+        """
+        self._logger.info(f"Checking pages for: {endpoint}...")
+
+        with span("get_pages", endpoint=endpoint):
+            response = self._get(f"{self.base_url}{endpoint}", params)
+
+        return parse_last_page(response.headers.get("Link"), self._logger)
+
+    def iter_pages(
+        self,
+        endpoint: str,
+        params: dict,
+        logger: logging.Logger | None = None,
+        description: str | None = None,
+        max_workers: int | None = None,
+        shape: Callable[[dict], object] | None = None,
+    ) -> Iterator[list]:
+        """
+        Yields every page of a resource, one list of items at a time.
+
+        The first page doubles as the probe for the `Link` header, so no page is requested twice.
+
+        Args:
+            endpoint: Endpoint relative to the API base URL, such as "users".
+            params: Query params, as built by `build_params`. The page number is read from it.
+            logger: Logger used to report progress, defaults to the paginator's.
+            description: What is being extracted, used in the progress messages.
+            max_workers: Number of pages fetched concurrently after the first one, defaults to the paginator's.
+            shape: Function applied to every item as its page is decoded, as built by `make_shaper`.
+
+        Yields:
+            The decoded JSON list of each page, in page order.
+        """
+        logger = logger or self._logger
+        description = description or f"{endpoint} data"
+        max_workers = max_workers or self.max_workers
+        request_url = f"{self.base_url}{endpoint}"
+        params = dict(params)
+
+        logger.info(f"Checking pages for: {endpoint}...")
+        response = self._get(request_url, params)
+
+        last_page = parse_last_page(response.headers.get("Link"), logger)
+
+        if max_workers > 1 and last_page - params["page[number]"] > 1:
+            logger.info(f"Extracting {description}, page {params['page[number]']}...")
+            yield self._decode_page(response, shape)
+            yield from self._iter_pages_concurrently(
+                request_url,
+                params,
+                params["page[number]"] + 1,
+                last_page,
+                max_workers,
+                logger,
+                description,
+                shape,
+            )
+            return
+
+        while True:
+            if last_page == 1:
+                logger.info(f"Extracting {description}...")
+            else:
+                logger.info(f"Extracting {description}, page {params['page[number]']}...")
+
+            page_items = self._decode_page(response, shape)
+            yield page_items
+
+            if not page_items or params["page[number]"] >= last_page:
+                return
+
+            params["page[number]"] += 1
+            response = self._get(request_url, params)
+
+    def iter_keyset_pages(
+        self,
+        endpoint: str,
+        params: dict,
+        logger: logging.Logger | None = None,
+        description: str | None = None,
+        shape: Callable[[dict], object] | None = None,
+    ) -> Iterator[list]:
+        """
+        Yields every page of a resource through keyset pagination: items sorted by id, each page requesting the ids above the last one seen.
+
+        No `Link` probe is needed and every page costs the same however deep the extraction goes. Records changing during the run can't cause gaps or duplicates, and items repeated across pages are dropped by id. Pages are fetched one after another, since each one starts where the previous one ended.
+
+        Args:
+            endpoint: Endpoint relative to the API base URL, such as "users".
+            params: Query params, as built by `build_params`. They can't sort or filter on ids themselves.
+            logger: Logger used to report progress, defaults to the paginator's.
+            description: What is being extracted, used in the progress messages.
+            shape: Function applied to every item as its page is decoded. Shaped items must keep their "id".
+
+        Yields:
+            The items of each page, in id order.
+
+        Raises:
+            ValueError: If the params already sort or filter on ids.
+        """
+        if "sort" in params or "range[id]" in params:
+            raise ValueError("Keyset pagination sorts and filters on ids itself, drop 'sort' and 'range[id]'.")
+
+        logger = logger or self._logger
+        description = description or f"{endpoint} data"
+        request_url = f"{self.base_url}{endpoint}"
+        page_size = min(params["page[size]"], MAX_PAGE_SIZE)
+        params = {**params, "page[size]": page_size}
+
+        after_id = None
+        page = 1
+        while True:
+            logger.info(f"Extracting {description}, page {page} (ids after {after_id or 0})...")
+            response = self._get(request_url, keyset_params(params, after_id))
+            page_items = self._decode_page(response, shape)
+
+            new_items = [
+                item for item in page_items if after_id is None or item["id"] > after_id
+            ]
+            if new_items:
+                yield new_items
+                after_id = max(item["id"] for item in new_items)
+            elif page_items:
+                logger.warning(f"Page {page} only held ids already extracted, stopping.")
+
+            if len(page_items) < page_size or not new_items:
+                return
+            page += 1
+
+    def _decode_page(self, response, shape: Callable[[dict], object] | None) -> list:
+        with span("json_decode", "cpu", bytes=len(response.content)) as args:
+            page_items = loads(response.content)
+            args["items"] = len(page_items)
+        if self.session.metrics is not None:
+            self.session.metrics.add_items(response.url, len(page_items))
+        if shape is None:
+            return page_items
+        with span("shape", "cpu", items=len(page_items)):
+            return [shape(item) for item in page_items]
+
+    def _fetch_page(
+        self,
+        request_url: str,
+        params: dict,
+        page: int,
+        shape: Callable[[dict], object] | None = None,
+    ) -> list:
+        response = self._get(request_url, {**params, "page[number]": page})
+        return self._decode_page(response, shape)
+
+    def _iter_pages_concurrently(
+        self,
+        request_url: str,
+        params: dict,
+        first_page: int,
+        last_page: int,
+        max_workers: int,
+        logger: logging.Logger,
+        description: str,
+        shape: Callable[[dict], object] | None = None,
+    ) -> Iterator[list]:
+        """
+        Fetches pages `first_page` to `last_page` through a bounded worker pool, yielding them in page order.
+
+        Only a window of twice `max_workers` pages is in flight at once, so memory stays bounded when the consumer is slower than the API. Every worker goes through the shared session, so the rate limiter keeps pacing the requests.
+        """
+        pending: deque[Future] = deque()
+        next_page = first_page
+        window = max_workers * 2
+
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="Paginator"
+        ) as executor:
+            try:
+                while pending or next_page <= last_page:
+                    while next_page <= last_page and len(pending) < window:
+                        logger.info(f"Extracting {description}, page {next_page}...")
+                        pending.append(
+                            executor.submit(
+                                contextvars.copy_context().run,
+                                self._fetch_page,
+                                request_url,
+                                params,
+                                next_page,
+                                shape,
+                            )
+                        )
+                        next_page += 1
+
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def iter_items(
+        self,
+        endpoint: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        limit: int | None = None,
+        stop: Callable[[dict | Record], bool] | None = None,
+        logger: logging.Logger | None = None,
+        description: str | None = None,
+        max_workers: int | None = None,
+        fields: Iterable[str] | None = None,
+        model: type[Record] | None = None,
+        keyset: bool | None = None,
+        **kwargs,
+    ) -> Iterator[dict | Record]:
+        """
+        Lazily yields the items of a resource, fetching pages only as they are consumed.
+
+        Args:
+            endpoint: Endpoint relative to the API base URL, such as "users/42/projects_users".
+            page_size: Number of items requested per page, at most 100.
+            limit: Maximum number of items to yield before stopping.
+            stop: Predicate called on each item; the iteration stops, without yielding it, on the first True.
+            logger: Logger used to report progress.
+            description: What is being extracted, used in the progress messages.
+            max_workers: Number of pages fetched concurrently, defaults to the paginator's.
+            fields: Names or dotted paths of the fields to keep, dropping the rest of each item as its page is decoded.
+            model: Record model, such as `User`, each item is turned into instead of a dict.
+            keyset: Whether to paginate by id range instead of page number, defaults to the paginator's setting. Items then come in id order.
+            **kwargs: Query params, such as "filter[pool_year]". The ones with a None value are dropped.
+
+        Yields:
+            Each item of the resource, in API order, projected or modelled when asked to.
+        """
+        keyset = self.keyset if keyset is None else keyset
+        if keyset and fields is not None:
+            fields = list(dict.fromkeys(["id", *fields]))
+        shape = make_shaper(fields, model)
+        if limit is not None and limit <= 0:
+            return
+
+        params = build_params(page_size, **kwargs)
+        yielded = 0
+        if keyset:
+            pages = self.iter_keyset_pages(endpoint, params, logger, description, shape)
+        else:
+            pages = self.iter_pages(endpoint, params, logger, description, max_workers, shape)
+
+        for page_items in pages:
+            for item in page_items:
+                if stop is not None and stop(item):
+                    return
+                yield item
+                yielded += 1
+                if limit is not None and yielded >= limit:
+                    return
@@ -0,0 +1,60 @@
+"""
+Field projection for API records: keep only the fields a step needs, dropping the large nested payloads the API returns by default.
+"""
+
+from typing import Iterable
+
+_MISSING = object()
+
+
+def get_path(record: dict, path: str, default=None):
+    """
+    Reads a field of a record by its dotted path, such as "user.id".
+
+    Returns:
+        The value, or `default` when any part of the path is missing.
+    """
+    value = record
+    for part in path.split("."):
+        value = value.get(part, _MISSING) if isinstance(value, dict) else _MISSING
+        if value is _MISSING:
+            return default
+
+    return value
+
+
+def project(record: dict, fields: Iterable[str]) -> dict:
+    """
+    Copies only the requested fields of a record.
+
+    Nested fields are given as dotted paths, such as "user.id", and keep their nesting in the result. Missing fields are left out.
+
+    Args:
+        record: A record, as decoded from the API.
+        fields: Names or dotted paths of the fields to keep.
+
+    Returns:
+        A new dictionary with the requested fields only.
+
+    Example:
+        >>> project({"id": 1, "user": {"id": 2, "login": "x"}}, ["id", "user.id"])
+        {'id': 1, 'user': {'id': 2}}
+    """
+    result = {}
+    for field in fields:
+        parts = field.split(".")
+
+        value = record
+        for part in parts:
+            value = value.get(part, _MISSING) if isinstance(value, dict) else _MISSING
+            if value is _MISSING:
+                break
+        if value is _MISSING:
+            continue
+
+        target = result
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+
+    return result
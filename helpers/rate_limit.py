@@ -0,0 +1,240 @@
+"""
+Header-driven rate limiter for École 42's API.
+
+Every response carries the application's secondly and hourly budgets in its headers, so instead of sleeping a flat second after each request we pace requests to what the API reports.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+import requests
+
+from helpers.tracing import span
+
+SECONDLY_LIMIT_HEADER = "X-Secondly-RateLimit-Limit"
+SECONDLY_REMAINING_HEADER = "X-Secondly-RateLimit-Remaining"
+HOURLY_LIMIT_HEADER = "X-Hourly-RateLimit-Limit"
+HOURLY_REMAINING_HEADER = "X-Hourly-RateLimit-Remaining"
+
+DEFAULT_SECONDLY_LIMIT = 2
+DEFAULT_HOURLY_LIMIT = 1200
+DEFAULT_HOURLY_RESERVE = 0.1
+
+
+def _int_header(headers, name: str) -> int | None:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parses a `Retry-After` header, given either in seconds or as an HTTP date.
+
+    Args:
+        value: Raw header value, if any.
+
+    Returns:
+        The number of seconds to wait, or None when the header is missing or malformed.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    from email.utils import parsedate_to_datetime
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket fed by the API's rate-limit headers.
+
+    The secondly budget is a bucket refilled at the secondly limit, so requests go out back-to-back while it has tokens. Once the hourly budget falls under `hourly_reserve` of its limit, the remaining requests are spread evenly until the top of the hour instead of burning them and hitting 429s.
+
+    Attributes:
+        hourly_reserve: Fraction of the hourly limit below which requests start being spread out.
+        total_wait: Total number of seconds spent waiting for the budget.
+    """
+
+    def __init__(
+        self,
+        secondly_limit: int = DEFAULT_SECONDLY_LIMIT,
+        hourly_limit: int = DEFAULT_HOURLY_LIMIT,
+        hourly_reserve: float = DEFAULT_HOURLY_RESERVE,
+    ):
+        self._lock = threading.Lock()
+        self._logger = logging.getLogger("RATE_LIMITER")
+
+        self._secondly_limit = secondly_limit
+        self._tokens = float(secondly_limit)
+        self._refilled_at = time.monotonic()
+
+        self._hourly_limit = hourly_limit
+        self._hourly_remaining = None
+        self._next_hourly_slot = 0.0
+        self._blocked_until = 0.0
+
+        self.hourly_reserve = hourly_reserve
+        self.total_wait = 0.0
+
+    @property
+    def hourly_remaining(self) -> int | None:
+        return self._hourly_remaining
+
+    @property
+    def budget(self) -> float:
+        """
+        Requests left this hour, or the hourly limit until the API reported it, plus the secondly tokens at hand as a tie-breaker.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            hourly = self._hourly_limit if self._hourly_remaining is None else self._hourly_remaining
+            return hourly + self._tokens / (self._secondly_limit + 1)
+
+    def available_in(self) -> float:
+        """
+        Estimates how long a request would wait for the budget, without reserving anything.
+
+        Returns:
+            The delay in seconds, 0 when a request can go out right away.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            delay = max(0.0, (1 - self._tokens) / self._secondly_limit, self._blocked_until - now)
+            if self._hourly_remaining is not None and self._hourly_remaining <= 0:
+                delay = max(delay, 3600 - time.time() % 3600)
+            return delay
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._refilled_at
+        self._tokens = min(
+            float(self._secondly_limit), self._tokens + elapsed * self._secondly_limit
+        )
+        self._refilled_at = now
+
+    def _hourly_delay(self, now: float) -> float:
+        remaining = self._hourly_remaining
+        if remaining is None or remaining > self._hourly_limit * self.hourly_reserve:
+            return 0.0
+
+        until_reset = 3600 - time.time() % 3600
+        if remaining <= 0:
+            return until_reset
+
+        interval = until_reset / remaining
+        slot = max(now, self._next_hourly_slot)
+        self._next_hourly_slot = slot + interval
+        return slot - now
+
+    def reserve(self) -> float:
+        """
+        Reserves a slot for one request.
+
+        Returns:
+            How many seconds the caller must wait before sending the request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            self._tokens -= 1
+            delay = max(0.0, -self._tokens / self._secondly_limit)
+            delay = max(delay, self._blocked_until - now, self._hourly_delay(now))
+
+            if self._hourly_remaining is not None:
+                self._hourly_remaining -= 1
+
+            return delay
+
+    def acquire(self) -> float:
+        """
+        Blocks until a request can be sent without exceeding the budget.
+
+        Returns:
+            How many seconds were spent waiting.
+        """
+        return self.wait(self.reserve())
+
+    def wait(self, delay: float) -> float:
+        """
+        Sleeps for a delay returned by `reserve`, accounting it in `total_wait`.
+        """
+        if delay > 0:
+            self._logger.debug(f"Waiting {delay:.2f}s for the rate limit...")
+            with span("rate_limit_wait", "wait", delay=round(delay, 3)):
+                time.sleep(delay)
+            with self._lock:
+                self.total_wait += delay
+        return delay
+
+    async def acquire_async(self) -> float:
+        """
+        Same as `acquire`, without blocking the event loop.
+
+        Returns:
+            How many seconds were spent waiting.
+        """
+        return await self.wait_async(self.reserve())
+
+    async def wait_async(self, delay: float) -> float:
+        """
+        Same as `wait`, without blocking the event loop.
+        """
+        if delay > 0:
+            self._logger.debug(f"Waiting {delay:.2f}s for the rate limit...")
+            with span("rate_limit_wait", "wait", delay=round(delay, 3)):
+                await asyncio.sleep(delay)
+            with self._lock:
+                self.total_wait += delay
+        return delay
+
+    def update(self, response: requests.Response) -> None:
+        """
+        Adjusts the budget to the rate-limit headers of a response.
+
+        Args:
+            response: Any response from the API, including 429s. `httpx` responses work as well.
+        """
+        headers = response.headers
+        secondly_limit = _int_header(headers, SECONDLY_LIMIT_HEADER)
+        secondly_remaining = _int_header(headers, SECONDLY_REMAINING_HEADER)
+        hourly_limit = _int_header(headers, HOURLY_LIMIT_HEADER)
+        hourly_remaining = _int_header(headers, HOURLY_REMAINING_HEADER)
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            if secondly_limit:
+                self._secondly_limit = secondly_limit
+            if secondly_remaining is not None:
+                self._tokens = min(self._tokens, float(secondly_remaining))
+            if hourly_limit:
+                self._hourly_limit = hourly_limit
+            if hourly_remaining is not None:
+                self._hourly_remaining = hourly_remaining
+
+            if response.status_code == 429:
+                retry_after = parse_retry_after(headers.get("Retry-After"))
+                if retry_after is None:
+                    retry_after = 1.0
+                self._logger.warning(
+                    f"Rate limited by the API. Holding requests for {retry_after:.2f}s..."
+                )
+                self._tokens = min(self._tokens, 0.0)
+                self._blocked_until = max(self._blocked_until, now + retry_after)
@@ -0,0 +1,217 @@
+"""
+Lazy readers for extracted datasets: records are decoded one at a time from NDJSON files or large JSON arrays, so a step that only needs user ids never holds the whole file in memory.
+"""
+
+import gzip
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import IO, Iterable, Iterator
+
+from helpers.codec import loads
+from helpers.projection import project
+from helpers.sinks import tmp_path_for
+
+CHUNK_SIZE = 64 * 1024
+INDEX_SUFFIX = ".idx"
+
+
+def _is_ndjson(path: Path) -> bool:
+    return path.name.endswith((".ndjson", ".ndjson.gz", ".jsonl", ".jsonl.gz"))
+
+
+def _open_text(path: Path) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def _iter_ndjson_lines(path: Path, use_mmap: bool) -> Iterator[bytes]:
+    if path.suffix == ".gz" or not use_mmap or path.stat().st_size == 0:
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rb") as f:
+            yield from f
+        return
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for line in iter(mapped.readline, b""):
+            yield line
+
+
+def _iter_json_array(f: IO[str], chunk_size: int = CHUNK_SIZE) -> Iterator:
+    """
+    Decodes the elements of a top-level JSON array one at a time, reading the file in chunks.
+
+    A document that isn't an array, such as the single campus object, is yielded as one record.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill() -> None:
+        nonlocal buffer, pos, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def skip_whitespace() -> bool:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer):
+                return True
+            if eof:
+                return False
+            fill()
+
+    if not skip_whitespace():
+        return
+
+    if buffer[pos] != "[":
+        yield json.loads(buffer[pos:] + f.read())
+        return
+    pos += 1
+
+    while skip_whitespace():
+        if buffer[pos] == "]":
+            return
+        if buffer[pos] == ",":
+            pos += 1
+            continue
+
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+
+        if end == len(buffer) and not eof:
+            fill()
+            continue
+
+        yield record
+        pos = end
+
+    raise json.JSONDecodeError("Unterminated JSON array", buffer, pos)
+
+
+def iter_records(
+    path: str | Path,
+    fields: Iterable[str] | None = None,
+    use_mmap: bool = True,
+) -> Iterator[dict]:
+    """
+    Lazily iterates the records of an NDJSON file (optionally gzipped) or a JSON array file.
+
+    Args:
+        path: File to read.
+        fields: Names or dotted paths of the fields to keep, every field when None.
+        use_mmap: Whether uncompressed NDJSON files are memory-mapped instead of read.
+
+    Yields:
+        Each record, projected to `fields` when given.
+    """
+    path = Path(path)
+    fields = list(fields) if fields is not None else None
+
+    if _is_ndjson(path):
+        records = (
+            loads(line)
+            for line in _iter_ndjson_lines(path, use_mmap)
+            if line.strip()
+        )
+        for record in records:
+            yield project(record, fields) if fields is not None else record
+        return
+
+    with _open_text(path) as f:
+        for record in _iter_json_array(f):
+            yield project(record, fields) if fields is not None else record
+
+
+def build_index(path: str | Path, key: str = "id") -> dict:
+    """
+    Builds the sidecar offset index of an uncompressed NDJSON file, mapping each record's key to its byte offset.
+
+    The index is saved next to the file, as `<file>.idx`, and rebuilt whenever the file is newer than it.
+
+    Args:
+        path: NDJSON file to index.
+        key: Field identifying the records.
+
+    Returns:
+        The index, with the keys as strings.
+
+    Raises:
+        ValueError: If the file isn't an uncompressed NDJSON file.
+    """
+    path = Path(path)
+    if not _is_ndjson(path) or path.suffix == ".gz":
+        raise ValueError(f"Only uncompressed NDJSON files can be indexed, got '{path}'.")
+
+    index = {}
+    offset = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                index[str(loads(line)[key])] = offset
+            offset += len(line)
+
+    index_path = Path(f"{path}{INDEX_SUFFIX}")
+    tmp_path = tmp_path_for(index_path)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"key": key, "offsets": index}, f)
+    os.replace(tmp_path, index_path)
+
+    return index
+
+
+def load_index(path: str | Path, key: str = "id") -> dict:
+    """
+    Loads the sidecar offset index of an NDJSON file, building it when missing or stale.
+    """
+    path = Path(path)
+    index_path = Path(f"{path}{INDEX_SUFFIX}")
+
+    if index_path.is_file() and index_path.stat().st_mtime >= path.stat().st_mtime:
+        with open(index_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("key") == key:
+            return data["offsets"]
+
+    return build_index(path, key)
+
+
+def get_record(
+    path: str | Path,
+    record_id,
+    key: str = "id",
+    fields: Iterable[str] | None = None,
+) -> dict | None:
+    """
+    Reads a single record from an NDJSON file through its offset index, without scanning the file.
+
+    Args:
+        path: Uncompressed NDJSON file.
+        record_id: Value of the record's key.
+        key: Field identifying the records.
+        fields: Names or dotted paths of the fields to keep.
+
+    Returns:
+        The record, or None if no record has this id.
+    """
+    offset = load_index(path, key).get(str(record_id))
+    if offset is None:
+        return None
+
+    with open(path, "rb") as f:
+        f.seek(offset)
+        record = loads(f.readline())
+
+    return project(record, fields) if fields is not None else record
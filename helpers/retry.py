@@ -0,0 +1,135 @@
+"""
+Central retry policy for transient failures: 429s, 5xx gateway errors and dropped connections are retried with capped exponential backoff and jitter, honouring `Retry-After`, instead of killing a multi-hour extraction.
+"""
+
+import random
+import threading
+from collections import Counter
+from fnmatch import fnmatch
+
+from helpers.pagination import endpoint_from_url
+from helpers.rate_limit import parse_retry_after
+
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_MAX_BACKOFF = 60.0
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed request is retried, and after how long.
+
+    The delay of attempt `n` is drawn uniformly between 0 and `min(max_backoff, backoff_factor * 2**n)` ("full jitter"), but never shorter than the response's `Retry-After`.
+
+    Attributes:
+        max_retries: Default number of retries of a request.
+        backoff_factor: Base delay of the exponential backoff, in seconds.
+        max_backoff: Cap of the backoff, in seconds.
+        statuses: Status codes considered transient.
+        budgets: Mapping of endpoint patterns, such as "users/*/projects_users", to their own number of retries.
+        retries: Counter of retries per endpoint.
+        reasons: Counter of retries per reason, a status code or an exception name.
+        exhausted: Counter of requests per endpoint that failed after using up their retries.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        statuses: frozenset = RETRY_STATUSES,
+        budgets: dict | None = None,
+    ):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.statuses = statuses
+        self.budgets = dict(budgets or {})
+
+        self._lock = threading.Lock()
+        self.retries = Counter()
+        self.reasons = Counter()
+        self.exhausted = Counter()
+
+    def retries_for(self, url: str) -> int:
+        """
+        Number of retries allowed for a URL's endpoint.
+        """
+        endpoint = endpoint_from_url(url)
+        for pattern, budget in self.budgets.items():
+            if fnmatch(endpoint, pattern):
+                return budget
+
+        return self.max_retries
+
+    def should_retry(
+        self,
+        url: str,
+        attempt: int,
+        status_code: int | None = None,
+        error: BaseException | None = None,
+    ) -> bool:
+        """
+        Tells whether a request should be retried, recording the retry when it should.
+
+        Args:
+            url: URL of the request.
+            attempt: Number of retries already made for this request.
+            status_code: Status of the response, when one was received.
+            error: Transient exception raised instead of a response.
+
+        Returns:
+            True when the request should be sent again.
+        """
+        if error is None and status_code not in self.statuses:
+            return False
+
+        endpoint = endpoint_from_url(url)
+        reason = type(error).__name__ if error is not None else str(status_code)
+
+        with self._lock:
+            if attempt >= self.retries_for(url):
+                self.exhausted[endpoint] += 1
+                return False
+
+            self.retries[endpoint] += 1
+            self.reasons[reason] += 1
+            return True
+
+    def backoff(self, attempt: int, retry_after: str | None = None) -> float:
+        """
+        Computes how long to wait before a retry.
+
+        Args:
+            attempt: Number of retries already made for this request.
+            retry_after: Raw `Retry-After` header of the response, if any.
+
+        Returns:
+            The delay, in seconds.
+        """
+        cap = min(self.max_backoff, self.backoff_factor * 2**attempt)
+        delay = random.uniform(0, cap)
+
+        retry_after = parse_retry_after(retry_after)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        return delay
+
+    @property
+    def total_retries(self) -> int:
+        return sum(self.retries.values())
+
+    def summary(self) -> dict:
+        """
+        Retry counts, to tune the policy.
+        """
+        with self._lock:
+            return {
+                "total_retries": sum(self.retries.values()),
+                "by_endpoint": dict(self.retries),
+                "by_reason": dict(self.reasons),
+                "exhausted": dict(self.exhausted),
+            }
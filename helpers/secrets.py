@@ -0,0 +1,208 @@
+"""
+Secret resolution shared by the sync and async clients: Google Secret Manager when running on Cloud Run, the local environment and .env file otherwise.
+
+The Secret Manager client and the project id are resolved once per process, and several secrets can be fetched in parallel, to keep the cold start of short jobs low. The Google libraries are only imported on Cloud Run.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+import requests
+
+from helpers.config import get_env
+from helpers.session import APISession
+
+if TYPE_CHECKING:
+    from google.cloud import secretmanager
+
+logger = logging.getLogger("FT_Client")
+
+METADATA_PROJECT_URL = "http://metadata.google.internal/computeMetadata/v1/project/project-id"
+
+_secrets_cache = {}
+_client = None
+_project_id = None
+_lock = threading.Lock()
+
+
+def on_cloud() -> bool:
+    """
+    Tells whether we're running on Cloud Run, where secrets live in Secret Manager.
+    """
+    return os.getenv("K_SERVICE") is not None
+
+
+def _get_client() -> "secretmanager.SecretManagerServiceClient":
+    global _client
+
+    if _client is None:
+        with _lock:
+            if _client is None:
+                from google.cloud import secretmanager
+
+                _client = secretmanager.SecretManagerServiceClient()
+
+    return _client
+
+
+def _get_project_id(session: APISession | None = None) -> str:
+    global _project_id
+
+    if _project_id is None:
+        with _lock:
+            if _project_id is None:
+                project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
+                if not project_id:
+                    metadata_headers = {"Metadata-Flavor": "Google"}
+                    if session is not None:
+                        response = session.get(
+                            METADATA_PROJECT_URL,
+                            headers=metadata_headers,
+                            authenticate=False,
+                            rate_limited=False,
+                        )
+                    else:
+                        response = requests.get(METADATA_PROJECT_URL, headers=metadata_headers)
+                    response.raise_for_status()
+                    project_id = response.text
+                _project_id = project_id
+
+    return _project_id
+
+
+def _cached(cache_key: str, ttl: float | None) -> str | None:
+    entry = _secrets_cache.get(cache_key)
+    if entry is None:
+        return None
+
+    value, fetched_at = entry
+    if ttl is not None and time.monotonic() - fetched_at >= ttl:
+        return None
+
+    logger.debug(f"Cache hit for secret: {cache_key}")
+    return value
+
+
+def _fetch_from_secret_manager(
+    secret_id: str, version: str, session: APISession | None
+) -> str | None:
+    from google.api_core import exceptions
+
+    logger.info(f"Trying to fetch secret '{secret_id}' from Secret Manager.")
+
+    try:
+        name = f"projects/{_get_project_id(session)}/secrets/{secret_id}/versions/{version}"
+        response = _get_client().access_secret_version(request={"name": name})
+        secret_value = response.payload.data.decode("UTF-8")
+
+        logger.info(f"Successfully fetched secret '{secret_id}' from Secret Manager!")
+        return secret_value
+
+    except exceptions.NotFound:
+        logger.error(f"Secret '{secret_id}' not found.")
+    except exceptions.PermissionDenied:
+        logger.error(f"Permission denied for secret '{secret_id}'. Check IAM Permission for the Service Account.")
+    except Exception as e:
+        logger.warning(f"Unexpected error fetching secret from SM: {str(e)}. Falling back to local env.")
+
+    return None
+
+
+def _fetch_from_env(secret_id: str) -> str:
+    logger.info(f"Executin' local fetch for secret '{secret_id}'...")
+
+    secret_value = get_env().str(secret_id, None)
+    if secret_value is None:
+        err_msg = (
+            f"Secret '{secret_id}' could not be found."
+            f"Checked: {'Secret Manager' if on_cloud() else ''}"
+            f"local environment variables, and .env file..."
+        )
+
+        logger.error(err_msg)
+        raise ValueError(err_msg)
+
+    logger.info(f"Found secret '{secret_id}' in local environment.")
+    return secret_value
+
+
+def get_secret(
+    secret_id: str,
+    version: str = "latest",
+    session: APISession | None = None,
+    ttl: float | None = None,
+) -> str:
+    """
+    Resolves a secret, caching it in the process.
+
+    Args:
+        secret_id: Name of the secret, which is also the name of its environment variable.
+        version: Secret Manager version of the secret.
+        session: Session used to query the metadata server for the project id, a bare request is made otherwise.
+        ttl: Seconds a cached value stays valid, so rotated secrets are picked up. Cached for the lifetime of the process when None.
+
+    Returns:
+        The secret's value.
+
+    Raises:
+        ValueError: If the secret can't be found anywhere.
+    """
+    cache_key = f"{secret_id}_{version}"
+
+    secret_value = _cached(cache_key, ttl)
+    if secret_value is not None:
+        return secret_value
+
+    if on_cloud():
+        secret_value = _fetch_from_secret_manager(secret_id, version, session)
+
+    if secret_value is None:
+        secret_value = _fetch_from_env(secret_id)
+
+    _secrets_cache[cache_key] = (secret_value, time.monotonic())
+    return secret_value
+
+
+def get_secrets(
+    secret_ids: list[str],
+    version: str = "latest",
+    session: APISession | None = None,
+    ttl: float | None = None,
+) -> dict[str, str]:
+    """
+    Resolves several secrets, fetching the ones missing from the cache in parallel on Cloud Run.
+
+    Args:
+        secret_ids: Names of the secrets.
+        version: Secret Manager version of the secrets.
+        session: Session used to query the metadata server for the project id.
+        ttl: Seconds a cached value stays valid, see `get_secret`.
+
+    Returns:
+        A dictionary of secret names to their values.
+
+    Raises:
+        ValueError: If any of the secrets can't be found anywhere.
+    """
+    missing = [
+        secret_id
+        for secret_id in secret_ids
+        if _cached(f"{secret_id}_{version}", ttl) is None
+    ]
+
+    if on_cloud() and len(missing) > 1:
+        with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            list(executor.map(lambda secret_id: get_secret(secret_id, version, session, ttl), missing))
+
+    return {
+        secret_id: get_secret(secret_id, version, session, ttl)
+        for secret_id in secret_ids
+    }
+
+
+def clear_secrets_cache() -> None:
+    _secrets_cache.clear()
@@ -0,0 +1,294 @@
+"""
+Pooled HTTP session shared by every request sent to École 42's API, so pages reuse kept-alive connections instead of paying a new TCP+TLS handshake each time.
+"""
+
+import logging
+import time
+from typing import TYPE_CHECKING
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from helpers.cache import ResponseCache
+from helpers.metrics import Metrics, RequestSample, endpoint_label
+from helpers.rate_limit import RateLimiter
+from helpers.retry import RetryPolicy
+from helpers.tracing import span
+
+if TYPE_CHECKING:
+    from helpers.credentials import CredentialPool
+
+DEFAULT_POOL_SIZE = 10
+
+TRANSIENT_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class APISession:
+    """
+    A thin wrapper around a `requests.Session` with a configurable connection pool.
+
+    Attributes:
+        credentials: Applications whose tokens authenticate requests, each paced by its own rate limiter, or None.
+        rate_limiter: Limiter pacing the rate-limited requests sent without credentials.
+        cache: Optional on-disk cache answering GET requests without touching the API.
+        retry_policy: Policy retrying every request on transient failures.
+        timeout: Default timeout, in seconds, for every request. None means no timeout.
+        metrics: Registry every request is recorded in, or None.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keep_alive: bool = True,
+        pool_block: bool = False,
+        transport: BaseAdapter | None = None,
+        credentials: "CredentialPool | None" = None,
+        timeout: float | None = None,
+        rate_limiter: RateLimiter | None = None,
+        cache: ResponseCache | None = None,
+        retry_policy: RetryPolicy | None = None,
+        metrics: Metrics | None = None,
+    ):
+        """
+        Builds the underlying session and mounts the transport for http and https.
+
+        Args:
+            pool_size: Maximum number of connections kept alive per host.
+            keep_alive: Whether connections are kept open between requests.
+            pool_block: Whether to block when the pool is exhausted instead of opening extra connections.
+            transport: Custom `requests` adapter to use instead of the default pooled `HTTPAdapter`.
+            credentials: Pool of applications authenticating requests. A 401 refreshes the rejected token and replays the request once.
+            timeout: Default timeout, in seconds, for every request.
+            rate_limiter: Limiter to share with other sessions, a new one is created by default.
+            cache: Response cache for GET requests. Hits don't consume the rate-limit budget.
+            retry_policy: Retry policy to share with other sessions, a default one is created otherwise.
+            metrics: Registry recording the status, latency, size, waits and retries of every request. Nothing is recorded when None.
+        """
+        self._session = requests.Session()
+
+        adapter = transport
+        if adapter is None:
+            adapter = HTTPAdapter(
+                pool_connections=pool_size,
+                pool_maxsize=pool_size,
+                pool_block=pool_block,
+            )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+        if not keep_alive:
+            self._session.headers["Connection"] = "close"
+
+        self.credentials = credentials
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.cache = cache
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.metrics = metrics
+        self._logger = logging.getLogger("API_SESSION")
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        authenticate: bool = True,
+        rate_limited: bool = True,
+        headers: dict | None = None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Sends a request through the pooled session.
+
+        Args:
+            method: HTTP method, such as "GET" or "POST".
+            url: Full URL for the request.
+            authenticate: Whether a token from the credential pool should be injected.
+            rate_limited: Whether the request counts against the API's rate limit. Token and metadata requests don't.
+            headers: Extra headers, taking precedence over the default ones.
+            **kwargs: Any other argument accepted by `requests.Session.request`.
+
+        Returns:
+            The `requests.Response` for the request.
+        """
+        if self.metrics is None:
+            return self._request(method, url, authenticate, rate_limited, headers, kwargs, None)
+
+        sample = RequestSample(method.upper(), url)
+        try:
+            response = self._request(method, url, authenticate, rate_limited, headers, kwargs, sample)
+        except Exception as e:
+            sample.status = type(e).__name__
+            self.metrics.record(sample)
+            raise
+
+        sample.status = sample.status or response.status_code
+        if kwargs.get("stream"):
+            sample.size = int(response.headers.get("Content-Length", 0))
+        else:
+            sample.size = len(response.content)
+        self.metrics.record(sample)
+        return response
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        authenticate: bool,
+        rate_limited: bool,
+        headers: dict | None,
+        kwargs: dict,
+        sample: RequestSample | None,
+    ) -> requests.Response:
+        request_headers = dict(headers or {})
+
+        kwargs.setdefault("timeout", self.timeout)
+
+        cached = None
+        use_cache = self.cache is not None and rate_limited and method.upper() == "GET"
+        if use_cache:
+            cached = self.cache.lookup(url, kwargs.get("params"))
+            if cached is not None and cached.fresh:
+                if sample is not None:
+                    sample.cached = True
+                return cached.to_response()
+            if cached is not None:
+                request_headers = {**cached.conditional_headers(), **request_headers}
+
+        response = self._send_with_retries(
+            method, url, request_headers, authenticate, rate_limited, kwargs, sample
+        )
+
+        if response.status_code == 401 and response.credential is not None:
+            self._logger.warning(f"Request to {url} was unauthorized. Replaying it with a fresh token...")
+            stale_token = response.request.headers.get("Authorization", "").removeprefix("Bearer ")
+            response.close()
+            response.credential.handle_unauthorized(stale_token, self)
+            if sample is not None:
+                sample.retries += 1
+            response = self._send_with_retries(
+                method, url, request_headers, authenticate, rate_limited, kwargs, sample
+            )
+
+        if use_cache:
+            if cached is not None and response.status_code == 304:
+                if sample is not None:
+                    sample.status = 304
+                self.cache.refresh(cached)
+                return cached.to_response()
+            self.cache.store(url, kwargs.get("params"), response)
+
+        return response
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        headers: dict,
+        authenticate: bool,
+        rate_limited: bool,
+        kwargs: dict,
+        sample: RequestSample | None = None,
+    ) -> requests.Response:
+        """
+        Sends a request once, with the token of the application picked by the credential pool.
+
+        The application is chosen again on every attempt, so a retry after a 429 goes to another one. It is attached to the response as `response.credential`, None for unauthenticated requests. The time spent waiting for the budget and on the network is added to `sample`.
+        """
+        credential = None
+        limiter = self.rate_limiter if rate_limited else None
+        waiting_since = time.perf_counter()
+        if authenticate and self.credentials is not None:
+            if rate_limited:
+                credential = self.credentials.acquire()
+                limiter = credential.rate_limiter
+            else:
+                credential = self.credentials.primary
+        elif limiter is not None:
+            limiter.acquire()
+        if sample is not None:
+            sample.wait += time.perf_counter() - waiting_since
+
+        if credential is not None:
+            headers = {**credential.auth_headers(self), **headers}
+
+        sent_at = time.perf_counter()
+        try:
+            with span("http_request", "network", method=method, endpoint=endpoint_label(url)) as args:
+                response = self._session.request(method, url, headers=headers, **kwargs)
+                args["status"] = response.status_code
+        finally:
+            if sample is not None:
+                sample.latency += time.perf_counter() - sent_at
+
+        if limiter is not None:
+            limiter.update(response)
+        response.credential = credential
+        return response
+
+    def _send_with_retries(
+        self,
+        method: str,
+        url: str,
+        headers: dict,
+        authenticate: bool,
+        rate_limited: bool,
+        kwargs: dict,
+        sample: RequestSample | None = None,
+    ) -> requests.Response:
+        """
+        Sends a request, retrying it on transient statuses and connection errors as the retry policy allows.
+
+        The last response is returned as is once the retries are used up, so callers still get to `raise_for_status` it.
+        """
+        attempt = 0
+        while True:
+            try:
+                response = self._send(
+                    method, url, headers, authenticate, rate_limited, kwargs, sample
+                )
+            except TRANSIENT_ERRORS as e:
+                if not self.retry_policy.should_retry(url, attempt, error=e):
+                    raise
+                delay = self.retry_policy.backoff(attempt)
+                reason = type(e).__name__
+            else:
+                if not self.retry_policy.should_retry(
+                    url, attempt, status_code=response.status_code
+                ):
+                    return response
+                retry_after = response.headers.get("Retry-After")
+                if response.status_code == 429 and self.credentials is not None and len(self.credentials) > 1:
+                    # The throttled application is held back by its own limiter, another one can take the retry.
+                    retry_after = None
+                delay = self.retry_policy.backoff(attempt, retry_after)
+                reason = response.status_code
+                response.close()
+
+            attempt += 1
+            if sample is not None:
+                sample.retries += 1
+                sample.backoff += delay
+            self._logger.warning(
+                f"Request to {url} failed ({reason}). Retry {attempt} in {delay:.2f}s..."
+            )
+            with span("retry_backoff", "wait", reason=reason, attempt=attempt):
+                time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,98 @@
+"""
+File sinks for extracted data. Records are streamed to disk as they arrive and published with an atomic rename, so a crash never leaves a truncated file behind.
+"""
+
+import gzip
+import os
+import threading
+from pathlib import Path
+from typing import IO, Iterable
+
+from helpers.codec import dump, dumps
+
+
+def tmp_path_for(path: Path) -> Path:
+    """
+    Name of the temporary file a write to `path` goes through before its atomic rename, unique per process and per thread, so concurrent jobs writing the same file never truncate each other's temporary file.
+    """
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def write_json_atomic(path: str | Path, data, pretty: bool = False) -> None:
+    """
+    Dumps data as a single JSON document, replacing `path` only once the whole file is written.
+
+    Args:
+        path: Destination file.
+        data: Any JSON serializable object. Records of `helpers.models` are saved as dicts.
+        pretty: Whether the output is indented, compact otherwise.
+    """
+    path = Path(path)
+    tmp_path = tmp_path_for(path)
+    try:
+        with open(tmp_path, "wb") as f:
+            dump(data, f, pretty)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+class NDJSONWriter:
+    """
+    Streams records to a newline-delimited JSON file, optionally gzip compressed.
+
+    Records go to a temporary file next to the destination, which is renamed over it when the writer exits cleanly. On error the temporary file is removed and any previous file is left untouched.
+
+    Example:
+        >>> with NDJSONWriter("data/users.ndjson.gz", compress=True) as writer:
+        ...     for page in extractor.iter_pages("users", params):
+        ...         writer.write_many(page)
+
+    Attributes:
+        path: Destination file.
+        compress: Whether the output is gzip compressed.
+        count: Number of records written so far.
+    """
+
+    def __init__(self, path: str | Path, compress: bool = False):
+        self.path = Path(path)
+        self.compress = compress
+        self.count = 0
+        self._tmp_path = tmp_path_for(self.path)
+        self._file: IO[bytes] | None = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.compress:
+            self._file = gzip.open(self._tmp_path, "wb")
+        else:
+            self._file = open(self._tmp_path, "wb")
+        return self
+
+    def write(self, record) -> None:
+        self._file.write(dumps(record) + b"\n")
+        self.count += 1
+
+    def write_many(self, records: Iterable) -> int:
+        """
+        Writes every record of an iterable, such as a page of results.
+
+        Returns:
+            The number of records written.
+        """
+        written = 0
+        for record in records:
+            self.write(record)
+            written += 1
+
+        return written
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self._file.close()
+        self._file = None
+
+        if exc_type is None:
+            os.replace(self._tmp_path, self.path)
+        else:
+            self._tmp_path.unlink(missing_ok=True)
@@ -0,0 +1,261 @@
+"""
+Embedded SQLite store for extracted datasets, as an alternative to flat JSON files.
+
+Records are kept as JSON documents keyed by (dataset, id), upserted in batched transactions, with expression indexes on the keys the scripts filter on. Reading a campus id or a year of users is then an indexed lookup instead of parsing a whole file.
+
+    >>> store = SQLiteStore()
+    >>> store.upsert("users", users)
+    >>> logins = [user["login"] for user in store.query("users", pool_year="2025")]
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from helpers.codec import dumps, loads
+from helpers.models import Record
+from helpers.projection import project
+
+DEFAULT_STORE_FILE = "data/ft_data.db"
+
+DEFAULT_BATCH_SIZE = 1000
+
+UPSERT_SQL = (
+    "INSERT INTO records (dataset, id, data) VALUES (?, ?, ?) "
+    "ON CONFLICT (dataset, id) DO UPDATE SET data = excluded.data"
+)
+
+# Indexed filter keys, each with the dotted paths it's read from: the flat field of a record model first, then the API's nesting.
+INDEXED_KEYS = {
+    "pool_year": ("pool_year",),
+    "primary_campus_id": ("primary_campus_id",),
+    "campus_id": ("campus_id",),
+    "cursus_id": ("cursus_id",),
+    "user_id": ("user_id", "user.id"),
+    "project_id": ("project_id", "project.id"),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    dataset TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (dataset, id)
+);
+"""
+
+
+def _json_path(key: str) -> str:
+    parts = key.split(".")
+    if not all(part and part.replace("_", "").replace("?", "").isalnum() for part in parts):
+        raise ValueError(f"Invalid filter key: {key!r}.")
+
+    return "$." + ".".join(f'"{part}"' for part in parts)
+
+
+def _key_expression(key: str) -> str:
+    """
+    SQL expression reading a filter key from a record's JSON, the same in indexes and queries so SQLite uses the index.
+    """
+    paths = INDEXED_KEYS.get(key, (key,))
+    extracts = [f"json_extract(data, '{_json_path(path)}')" for path in paths]
+    return extracts[0] if len(extracts) == 1 else f"coalesce({', '.join(extracts)})"
+
+
+def _encode(record) -> tuple[int, str]:
+    if isinstance(record, Record):
+        record = record.to_dict()
+    if not isinstance(record, dict) or record.get("id") is None:
+        raise ValueError("Only records with an 'id' can be stored.")
+
+    return record["id"], dumps(record).decode("utf-8")
+
+
+class SQLiteStore:
+    """
+    A SQLite database of datasets, safe to share between threads.
+
+    Every thread gets its own connection. The database runs in WAL mode, so readers never block the writer, and concurrent writers wait for each other instead of failing.
+
+    Attributes:
+        path: Location of the database file.
+        batch_size: Number of records written per transaction.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_STORE_FILE, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = self._connection()
+        with connection:
+            connection.executescript(SCHEMA)
+            for key in INDEXED_KEYS:
+                connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS records_{key} "
+                    f"ON records (dataset, {_key_expression(key)})"
+                )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+
+        return connection
+
+    def upsert(self, dataset: str, records: Iterable) -> int:
+        """
+        Inserts records, or replaces the stored ones with the same id.
+
+        Args:
+            dataset: Name of the dataset, such as "piscine_2025_users".
+            records: Dicts or record models, all with an "id".
+
+        Returns:
+            The number of records written.
+        """
+        connection = self._connection()
+        written = 0
+        batch = []
+        for record in records:
+            batch.append((dataset, *_encode(record)))
+            if len(batch) >= self.batch_size:
+                written += self._write(connection, batch)
+                batch = []
+
+        if batch:
+            written += self._write(connection, batch)
+
+        return written
+
+    @staticmethod
+    def _write(connection: sqlite3.Connection, batch: list) -> int:
+        with connection:
+            connection.executemany(UPSERT_SQL, batch)
+        return len(batch)
+
+    def replace(self, dataset: str, records: Iterable) -> int:
+        """
+        Replaces a whole dataset, in one transaction, so readers see either the old or the new version.
+
+        Returns:
+            The number of records written.
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM records WHERE dataset = ?", (dataset,))
+            # Page-number extractions can see a record twice when pages shift, the last copy wins.
+            connection.executemany(
+                UPSERT_SQL, ((dataset, *_encode(record)) for record in records)
+            )
+            return connection.execute(
+                "SELECT count(*) FROM records WHERE dataset = ?", (dataset,)
+            ).fetchone()[0]
+
+    def delete(self, dataset: str) -> None:
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM records WHERE dataset = ?", (dataset,))
+
+    def _where(self, dataset: str, filters: dict) -> tuple[str, list]:
+        clauses = ["dataset = ?"]
+        args = [dataset]
+        for key, value in filters.items():
+            expression = "id" if key == "id" else _key_expression(key)
+            if isinstance(value, (list, tuple, set, frozenset)):
+                values = list(value)
+                clauses.append(f"{expression} IN ({', '.join('?' * len(values))})")
+                args.extend(values)
+            elif value is None:
+                clauses.append(f"{expression} IS NULL")
+            else:
+                clauses.append(f"{expression} = ?")
+                args.append(value)
+
+        return " AND ".join(clauses), args
+
+    def query(
+        self,
+        dataset: str,
+        fields: Iterable[str] | None = None,
+        model: type[Record] | None = None,
+        limit: int | None = None,
+        **filters,
+    ) -> Iterator[dict | Record]:
+        """
+        Iterates the records of a dataset matching equality filters, in id order.
+
+        Args:
+            dataset: Name of the dataset.
+            fields: Names or dotted paths of the fields to keep.
+            model: Record model the stored records are loaded into.
+            limit: Maximum number of records returned.
+            **filters: Field values to match, such as pool_year="2025" or user_id=[1, 2]. Values compare with their JSON type, and lists match any of their values. Dotted fields are given with "__" in place of dots, such as cursus__slug="c-piscine".
+
+        Yields:
+            Each matching record.
+        """
+        filters = {key.replace("__", "."): value for key, value in filters.items()}
+        where, args = self._where(dataset, filters)
+        sql = f"SELECT data FROM records WHERE {where} ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+
+        fields = list(fields) if fields is not None else None
+        for (data,) in self._connection().execute(sql, args):
+            record = loads(data)
+            if fields is not None:
+                record = project(record, fields)
+            yield model.from_json(record) if model is not None else record
+
+    def get(self, dataset: str, record_id: int, **options) -> dict | Record | None:
+        """
+        Reads one record by id, through the primary key.
+        """
+        return next(self.query(dataset, id=record_id, limit=1, **options), None)
+
+    def first(self, dataset: str, **options) -> dict | Record | None:
+        return next(self.query(dataset, limit=1, **options), None)
+
+    def count(self, dataset: str, **filters) -> int:
+        filters = {key.replace("__", "."): value for key, value in filters.items()}
+        where, args = self._where(dataset, filters)
+        return self._connection().execute(
+            f"SELECT count(*) FROM records WHERE {where}", args
+        ).fetchone()[0]
+
+    def has(self, dataset: str) -> bool:
+        return self._connection().execute(
+            "SELECT 1 FROM records WHERE dataset = ? LIMIT 1", (dataset,)
+        ).fetchone() is not None
+
+    def datasets(self) -> list[str]:
+        return [
+            dataset
+            for (dataset,) in self._connection().execute(
+                "SELECT DISTINCT dataset FROM records ORDER BY dataset"
+            )
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
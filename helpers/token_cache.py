@@ -0,0 +1,91 @@
+"""
+Cross-process cache of OAuth2 access tokens, so short-lived jobs reuse a still-valid token instead of each paying a round-trip to the token endpoint.
+
+The file is guarded by an exclusive lock while a token is read or refreshed, so concurrent processes end up sharing a single refresh.
+"""
+
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from helpers.sinks import tmp_path_for
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locking, the cache still works for a single process.
+    fcntl = None
+
+DEFAULT_TOKEN_CACHE_FILE = "data/.token_cache.json"
+
+
+def _client_key(client_id: str) -> str:
+    return hashlib.sha256(client_id.encode("utf-8")).hexdigest()[:16]
+
+
+class TokenCache:
+    """
+    A JSON file of tokens per OAuth2 application, readable by its owner only.
+
+    Attributes:
+        path: Location of the cache file.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_TOKEN_CACHE_FILE):
+        self.path = Path(path)
+        self._lock_path = self.path.with_name(f"{self.path.name}.lock")
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """
+        Holds the cache's exclusive lock, across threads and processes.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def load(self, client_id: str, min_ttl: float = 0.0) -> dict | None:
+        """
+        Reads the cached token of an application, if it stays valid for at least `min_ttl` seconds.
+
+        Returns:
+            A dictionary with "token", "metadata" and "expires_at", or None.
+        """
+        entry = self._read().get(_client_key(client_id))
+        if entry is None or entry["expires_at"] - min_ttl <= time.time():
+            return None
+
+        return entry
+
+    def store(self, client_id: str, token_data: dict, expires_at: float) -> None:
+        """
+        Saves the token of an application. Call it while holding `locked()`.
+        """
+        entries = {
+            key: entry
+            for key, entry in self._read().items()
+            if entry["expires_at"] > time.time()
+        }
+        entries[_client_key(client_id)] = {**token_data, "expires_at": expires_at}
+
+        tmp_path = tmp_path_for(self.path)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,139 @@
+"""
+Opt-in span tracing of the extraction phases, written in the Chrome trace event format that Perfetto (ui.perfetto.dev) and chrome://tracing open.
+
+Spans time the rate-limit waits, the network round-trips, the JSON decoding, the file I/O and the extractions and jobs around them. Each thread and each asyncio task gets its own track, so the spans of a job, a page worker or a per-user task nest on their own line. Tracing costs nothing until it is started:
+
+    >>> with tracing("data/trace.json"):
+    ...     extractor.basic_extraction("users")
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+
+_tracer = None
+
+
+class Tracer:
+    """
+    Thread-safe collector of trace events.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = []
+        self._tracks = {}
+        self._task_tracks = weakref.WeakKeyDictionary()
+        self._track_count = 0
+        self._pid = os.getpid()
+        self._origin = time.perf_counter()
+
+    def _track(self) -> int:
+        """
+        Track id of the current asyncio task, or of the current thread, naming the track on first use.
+        """
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+
+        # Tasks are tracked by reference, since the id of a finished task gets reused.
+        tracks = self._task_tracks if task is not None else self._tracks
+        key = task if task is not None else threading.get_ident()
+        track = tracks.get(key)
+        if track is None:
+            self._track_count += 1
+            track = tracks[key] = self._track_count
+            name = task.get_name() if task is not None else threading.current_thread().name
+            self._events.append(
+                {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": track, "args": {"name": name}}
+            )
+        return track
+
+    def add(self, name: str, category: str, start: float, end: float, args: dict) -> None:
+        """
+        Records a complete span, from `start` to `end` in `time.perf_counter` seconds.
+        """
+        with self._lock:
+            self._events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": round((start - self._origin) * 1e6, 3),
+                    "dur": round((end - start) * 1e6, 3),
+                    "pid": self._pid,
+                    "tid": self._track(),
+                    "args": args,
+                }
+            )
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            events = list(self._events)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), default=str), encoding="utf-8")
+
+
+def start_tracing() -> Tracer:
+    """
+    Starts recording the spans of every thread and task, returning the tracer they go to.
+    """
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def stop_tracing(path: str | Path | None = None) -> Tracer | None:
+    """
+    Stops recording spans, writing the trace to `path` when given.
+
+    Returns:
+        The tracer that was recording, None if tracing wasn't started.
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None and path is not None:
+        tracer.write(path)
+    return tracer
+
+
+@contextmanager
+def tracing(path: str | Path):
+    """
+    Traces the block, writing the trace to `path` when it exits, even on errors.
+    """
+    tracer = start_tracing()
+    try:
+        yield tracer
+    finally:
+        stop_tracing(path)
+
+
+@contextmanager
+def span(name: str, category: str = "extraction", **args):
+    """
+    Times the block as a span of the current thread or task, when tracing is on.
+
+    Yields:
+        The span's args, which the block can complete with what it learns, such as a status code.
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield args
+        return
+
+    start = time.perf_counter()
+    try:
+        yield args
+    finally:
+        tracer.add(name, category, start, time.perf_counter(), args)
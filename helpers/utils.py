@@ -1,31 +1,60 @@
 """
-Scripts used to facilitate all kinds of processes, such as fetching data from École 42 API, or managing pagination and wait time.
+Scripts used to facilitate all kinds of processes, such as fetching data from École 42 API, or managing pagination.
 """
 
-import requests
-import time
-import re
+import json
+import threading
 
 import logging
+from typing import Iterable, Iterator
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+from helpers.batching import (
+    DEFAULT_BATCH_SIZE,
+    chunk_ids,
+    filter_length_budget,
+    group_items,
 )
+from helpers.config import api_url, setup_logging
+from helpers.pagination import Paginator, build_params
+from helpers.session import APISession
 
-from environs import env
+setup_logging()
 
-env.read_env()
+_session = None
+_session_lock = threading.Lock()
 
-REQ_URL = env.str("REQ_URL")
+
+def get_session() -> APISession:
+    """
+    The pooled, rate-limited session of the helpers below, created on first use so importing the module stays cheap.
+    """
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = APISession()
+
+    return _session
 
 
-def wait() -> None:
+def paginator(access_token: str, session: APISession | None = None) -> Paginator:
     """
-    Waits a second.
+    Builds the pagination engine the helpers below share with `FT_Extractor`, sending `access_token` with every page through a pooled, rate-limited session.
 
-    Since the API has a wait period, every request we make needs to wait a little. It would get tedious real quick to type "sleep" or "time.sleep(1)"
+    Args:
+        access_token: The Bearer credential that's going to be sent w/ the Authorization Header.
+        session: Session to send the pages through, such as `FT_Client.session` to share the client's pool and rate budget. The module's own session by default.
+
+    Returns:
+        A `Paginator` over the session.
     """
-    time.sleep(1)
+    return Paginator(
+        session if session is not None else get_session(),
+        api_url(),
+        headers={"Authorization": f"Bearer {access_token}"},
+        logger=logging.getLogger(name="GET_PAGES"),
+    )
 
 
 def gets_pages(
@@ -44,39 +73,12 @@ def gets_pages(
     Returns:
         last_page: The last page, as a integer, corresponding to the total amount of pages needed to be transversed.
     """
-    logger = logging.getLogger(name="GET_PAGES")
-    headers = {"Authorization": f"Bearer {access_token}"}
-
-    response = requests.get(request_url, headers=headers, params=params)
-    response.raise_for_status()
-
-    last_page = None
-
-    link_header = response.headers.get("Link")
-    if link_header:
-        logger.info(f"Link header found: {link_header}")
-
-        match = re.search(r'<[^>]*page=(\d+)[^>]*>;\s*rel="last"', link_header)
-        if match:
-            last_page = int(match.group(1))
-            logger.info(f"I've found {last_page} pages!")
-        else:
-            logger.info(
-                "No 'last' relation found in Link header, assuming single page."
-            )
-            last_page = 1
-    else:
-        logger.warning("No Link header, assuming only one page.")
-        last_page = 1
-
-    wait()
-
-    return last_page
+    return paginator(access_token).get_pages(request_url.removeprefix(api_url()), params)
 
 
 def get_all_cursus(access_token: str, per_page: int = 100) -> list:
     """
-    Makes a series of requests to École 42's API using gets_pages to determine the last page, with the objetive of transversing all cursus' data.
+    Makes a series of requests to École 42's API, walking every page of the cursus resource.
 
     Args:
         access_token: Access token to be used in Authorization Header.
@@ -86,39 +88,11 @@ def get_all_cursus(access_token: str, per_page: int = 100) -> list:
         A list of dictionaries corresponding to the cursus data for all the cursus from 42.
     """
     logger = logging.getLogger(__name__)
-    headers = {"Authorization": f"Bearer {access_token}"}
-
-    start_page = 1
-
-    params = {
-        "page[number]": start_page,
-        "page[size]": per_page,
-    }
-
-    last_page = gets_pages(access_token, f"{REQ_URL}cursus", params)
-    total_pages = last_page if last_page != 1 else 1
-
-    total_data = []
-
-    if start_page == total_pages:
-        logger.info(f"Extracting data from Cursus.")
-        response = requests.get(f"{REQ_URL}cursus", headers=headers, params=params)
-        response.raise_for_status()
-        total_data.append(response.json())
-
-    else:
-        while params["page[number]"] <= total_pages:
-            logger.info(
-                f"Extracting data from Cursus, page {params["page[number]"]}."
-            )
-            response = requests.get(f"{REQ_URL}cursus", headers=headers, params=params)
-            response.raise_for_status()
-            total_data.append(response.json())
-            params["page[number]"] += 1
-            wait()
-
-    flat_data = [item for sublist in total_data for item in sublist]
-    return flat_data
+    return list(
+        paginator(access_token).iter_items(
+            "cursus", per_page, logger=logger, description="data from Cursus"
+        )
+    )
 
 
 def get_campus(
@@ -139,7 +113,7 @@ def get_campus(
     params = {"filter[city]": city_filter}
 
     logger.info(f"Extracting {city_filter} Campus Data...")
-    response = requests.get(f"{REQ_URL}campus", headers=headers, params=params)
+    response = get_session().get(f"{api_url()}campus", headers=headers, params=params)
 
     response.raise_for_status()
     response = response.json()
@@ -147,6 +121,13 @@ def get_campus(
 
     return response
 
+def filters(**kwargs) -> dict:
+    """
+    Turns keyword arguments into `filter[<key>]` query params, dropping the ones with a None value.
+    """
+    return {f"filter[{key}]": value for key, value in kwargs.items() if value is not None}
+
+
 def get_students_filter(access_token: str, **kwargs) -> list:
     """
     Fetches and filters student user data from École 42's API, with pagination support.
@@ -163,41 +144,35 @@ def get_students_filter(access_token: str, **kwargs) -> list:
         requests.HTTPError: If any of the API requests fail.
 
     Logs:
-        - The final parameters sent to the API.
         - The extraction process for each page.
     """
     logger = logging.getLogger(name="STUDENTS_EXTRACTION")
-    headers = {"Authorization": f"Bearer {access_token}"}
-    start_page = 1
-
-    params = {"page[number]": start_page, "page[size]": 100}
-
-    for key, value in kwargs.items():
-        if value is not None:
-            params[f"filter[{key}]"] = value
-
-    last_page = gets_pages(access_token, f"{REQ_URL}users", params)
-    total_pages = last_page if last_page != 1 else 1
+    return list(
+        paginator(access_token).iter_items(
+            "users", logger=logger, description="Users data", **filters(**kwargs)
+        )
+    )
 
-    total_data = []
-
-    if start_page == total_pages:
-        logger.info(f"Extracting Users data...")
-        response = requests.get(f"{REQ_URL}users", headers=headers, params=params)
-        response.raise_for_status()
-        total_data.append(response.json())
+def iter_students_pages(
+        access_token: str,
+        session: APISession | None = None,
+        **kwargs
+) -> Iterator[list]:
+    """
+    Streams the student user data of `get_students_filter` one page at a time, so it can be written as it arrives.
 
-    else:
-        while params["page[number]"] <= total_pages:
-            logger.info(f"Extracting data from Users, page {params['page[number]']}...")
-            response = requests.get(f"{REQ_URL}users", headers=headers, params=params)
-            response.raise_for_status()
-            total_data.append(response.json())
-            params["page[number]"] += 1
-            wait()
+    Args:
+        access_token: The Bearer token used for API authentication.
+        session: Session to send the pages through, see `paginator`.
+        **kwargs: Filters, each one sent as `filter[<key>]`.
 
-    flat_data = [item for sublist in total_data for item in sublist]
-    return flat_data
+    Yields:
+        Each page of user data.
+    """
+    logger = logging.getLogger(name="STUDENTS_EXTRACTION")
+    yield from paginator(access_token, session).iter_pages(
+        "users", build_params(**filters(**kwargs)), logger, "Users data"
+    )
 
 def get_project_users_filter(
         access_token: str,
@@ -205,72 +180,106 @@ def get_project_users_filter(
         **kwargs
 ):
     logger = logging.getLogger(name="PROJECT_USERS_EXTRACTION")
-    headers = {"Authorization": f"Bearer {access_token}"}
-    start_page = 1
-
-    params = {"page[number]": start_page, "page[size]": 100}
-
-    for key, value in kwargs.items():
-        if value is not None:
-            params[f"filter[{key}]"] = value
+    return list(
+        paginator(access_token).iter_items(
+            f"users/{user_data['id']}/projects_users",
+            logger=logger,
+            description=f"Project User data from: {user_data['displayname']} aka: {user_data['login']}",
+            **filters(**kwargs),
+        )
+    )
+
+def iter_project_users_pages(
+        access_token: str,
+        user_ids: Iterable[int],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        session: APISession | None = None,
+        **kwargs
+) -> Iterator[list]:
+    """
+    Streams the Project User data of many users one page at a time, packing their ids into `filter[user_id]=a,b,c` requests.
 
-    total_data = []
-    user_id = user_data['id']
+    Args:
+        access_token: The Bearer token used for API authentication.
+        user_ids: Ids of the users to fetch the projects of.
+        batch_size: Maximum number of user ids per request.
+        session: Session to send the pages through, see `paginator`.
+        **kwargs: Extra filters, each one sent as `filter[<key>]`.
+
+    Yields:
+        Each page of Project User data.
+    """
+    logger = logging.getLogger(name="PROJECT_USERS_EXTRACTION")
+    pages = paginator(access_token, session)
+
+    base_params = build_params(**filters(**kwargs))
+    max_length = filter_length_budget(
+        f"{api_url()}projects_users", base_params, "filter[user_id]"
+    )
+
+    for chunk in chunk_ids(user_ids, batch_size, max_length):
+        params = {
+            **base_params,
+            "filter[user_id]": ",".join(str(user_id) for user_id in chunk),
+        }
+
+        yield from pages.iter_pages(
+            "projects_users",
+            params,
+            logger,
+            f"Project User data for {len(chunk)} users",
+        )
+
+def get_project_users_batch(
+        access_token: str,
+        users_data: list,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        **kwargs
+) -> dict:
+    """
+    Fetches the Project User data of many users at once, see `iter_project_users_pages`.
 
-    last_page = gets_pages(access_token, f"{REQ_URL}users/{user_id}/projects_users", params)
-    total_pages = last_page if last_page != 1 else 1
+    Args:
+        access_token: The Bearer token used for API authentication.
+        users_data: Users to fetch the projects of, as returned by get_students_filter.
+        batch_size: Maximum number of user ids per request.
+        **kwargs: Extra filters, each one sent as `filter[<key>]`.
 
-    if start_page == total_pages:
-        logger.info(f"Extracting Project User data from: {user_data['displayname']} aka: {user_data['login']}...")
-        response = requests.get(f"{REQ_URL}users/{user_id}/projects_users", headers=headers, params=params)
-        response.raise_for_status()
-        total_data.append(response.json())
+    Returns:
+        A dictionary mapping every user id to the list of its Project User data.
+    """
+    grouped = {user["id"]: [] for user in users_data}
 
-    else:
-        while params["page[number]"] <= total_pages:
-            logger.info(f"Extracting Project User data from: {user_data['displayname']} aka: {user_data['login']}, page {params['page[number]']}...")
-            response = requests.get(f"{REQ_URL}users/{user_id}/projects_users", headers=headers, params=params)
-            response.raise_for_status()
-            total_data.append(response.json())
-            params["page[number]"] += 1
-            wait()
+    for page_items in iter_project_users_pages(
+        access_token, grouped, batch_size, **kwargs
+    ):
+        group_items(page_items, lambda item: item["user"]["id"], grouped)
 
-    flat_data = [item for sublist in total_data for item in sublist]
-    return flat_data
+    return grouped
 
 def get_all_students_by_cursus(
     access_token: str, cursus_id: int, campus_id: int, user_id: int
 ) -> list:
-    headers = {"Authorization": f"Bearer {access_token}"}
-    params = {
-        "filter[cursus_id]": cursus_id,
-        "page[size]": 1000,
-        "filter[campus_id]": campus_id,
-        "filter[user_id]": user_id,
-    }
-
-    response = requests.get(f"{REQ_URL}cursus_users", headers=headers, params=params)
-    response.raise_for_status()
+    students = list(
+        paginator(access_token).iter_items(
+            "cursus_users",
+            **filters(cursus_id=cursus_id, campus_id=campus_id, user_id=user_id),
+        )
+    )
+
     with open("students.json", "w", encoding="utf-8") as f:
-        import json
-        json.dump(response.json(), f, ensure_ascii=False, indent=4)
-    
-    return response.json()
+        json.dump(students, f, ensure_ascii=False, indent=4)
 
+    return students
 
-def get_campus_users(access_token: str, user_id: int) -> list:
-    headers = {"Authorization": f"Bearer {access_token}"}
-    params = {"page[size]": 1000, "filter[user_id]": user_id}
 
-    response = requests.get(f"{REQ_URL}campus_users", headers=headers, params=params)
-    response.raise_for_status()
-    return response.json()
+def get_campus_users(access_token: str, user_id: int) -> list:
+    return list(
+        paginator(access_token).iter_items("campus_users", **filters(user_id=user_id))
+    )
 
 
 def get_projects_by_user(access_token: str, user_id: int) -> list:
-    headers = {"Authorization": f"Bearer {access_token}"}
-    params = {"filter[user_id]": user_id, "page[size]": 1000}
-
-    response = requests.get(f"{REQ_URL}projects_users", headers=headers, params=params)
-    response.raise_for_status()
-    return response.json()
+    return list(
+        paginator(access_token).iter_items("projects_users", **filters(user_id=user_id))
+    )
@@ -0,0 +1,99 @@
+"""
+Persisted `updated_at` high-water marks, one per (endpoint, filter set), used by incremental extractions to fetch only the records changed since the previous run.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from urllib.parse import urlencode
+
+from helpers.sinks import tmp_path_for
+
+DEFAULT_WATERMARKS_FILE = "data/watermarks.json"
+
+IGNORED_PARAMS = ("page[number]", "page[size]", "range[updated_at]")
+
+
+def watermark_key(endpoint: str, params: dict) -> str:
+    """
+    Builds the key identifying an extraction: its endpoint plus its sorted filters, pagination left out.
+
+    Args:
+        endpoint: Endpoint relative to the API base URL.
+        params: Query params of the extraction.
+
+    Returns:
+        A key such as "users?filter[pool_year]=2025".
+    """
+    filters = sorted(
+        (key, str(value))
+        for key, value in params.items()
+        if key not in IGNORED_PARAMS and value is not None
+    )
+    if not filters:
+        return endpoint
+
+    return f"{endpoint}?{urlencode(filters, safe='[],')}"
+
+
+def latest_update(items: list, current: str | None = None) -> str | None:
+    """
+    Finds the most recent `updated_at` among items.
+
+    The API returns ISO 8601 UTC timestamps, which sort chronologically as strings.
+
+    Args:
+        items: Records returned by the API.
+        current: Watermark to start from.
+
+    Returns:
+        The greatest `updated_at` found, or `current` when no item is more recent.
+    """
+    latest = current
+    for item in items:
+        updated_at = item.get("updated_at")
+        if updated_at and (latest is None or updated_at > latest):
+            latest = updated_at
+
+    return latest
+
+
+class WatermarkStore:
+    """
+    A small JSON file mapping extraction keys to their `updated_at` high-water mark, safe to update from concurrent jobs.
+
+    Attributes:
+        path: Location of the JSON file.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_WATERMARKS_FILE):
+        self.path = Path(path)
+        self._marks = {}
+        self._lock = threading.Lock()
+        if self.path.is_file():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._marks = json.load(f)
+
+    def get(self, key: str) -> str | None:
+        return self._marks.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._marks[key] = value
+            self._save()
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            if self._marks.pop(key, None) is not None:
+                self._save()
+
+    def _save(self) -> None:
+        """
+        Writes the file, atomically replacing the previous one.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = tmp_path_for(self.path)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._marks, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,285 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.resolve()))
+
+import asyncio
+import logging
+import time
+import httpx
+from helpers.config import get_env, setup_logging
+from helpers.credentials import (
+	DEFAULT_TOKEN_SKEW,
+	Credential,
+	CredentialPool,
+	credential_keys,
+)
+from helpers.metrics import Metrics, RequestSample, endpoint_label
+from helpers.rate_limit import RateLimiter
+from helpers.retry import RetryPolicy
+from helpers.session import DEFAULT_POOL_SIZE
+from helpers.token_cache import TokenCache
+from helpers.tracing import span
+
+setup_logging()
+
+logger = logging.getLogger("AsyncFT_Client")
+
+class AsyncFT_Client:
+	"""
+	The asyncio counterpart of `FT_Client`, authenticating with the same `CredentialPool` of OAuth2 applications over one pooled `httpx.AsyncClient`.
+
+	Many tasks can share a single instance: their requests are multiplexed over the same connection pool, spread over the applications and paced by their rate limiters, as on the sync path.
+
+	Use it as an async context manager, so the first tokens are fetched on entry and the pool is closed on exit:
+
+		>>> async with AsyncFT_Client() as client:
+		...     token = await client.get_token()
+
+	Attributes:
+		_token_url (str): The endpoint URL for token requests.
+		_credentials (CredentialPool): The applications the client authenticates with, each with its own token and rate limiter.
+		_http (httpx.AsyncClient): Pooled HTTP client shared by every request.
+		_rate_limiter (RateLimiter): Limiter pacing the rate-limited requests sent without credentials.
+		_retry_policy (RetryPolicy): Policy retrying transient failures.
+		_metrics (Metrics): Metrics of every request sent by the client.
+	"""
+
+	def __init__(
+		self,
+		pool_size: int = DEFAULT_POOL_SIZE,
+		keep_alive: bool = True,
+		transport: httpx.AsyncBaseTransport | None = None,
+		rate_limiter: RateLimiter | None = None,
+		retry_policy: RetryPolicy | None = None,
+		token_skew: float = DEFAULT_TOKEN_SKEW,
+		token_cache: TokenCache | None = None,
+		secrets_ttl: float | None = None,
+		applications: int | None = None,
+		metrics: Metrics | None = None,
+	):
+		"""
+		Initializes the client. No request is made until the first token is needed.
+
+		Args:
+			pool_size: Maximum number of connections to the API.
+			keep_alive: Whether connections are reused between requests.
+			transport: Custom `httpx` transport to use instead of the default one.
+			rate_limiter: Limiter of the primary application, to share with other clients. A new one is created by default.
+			retry_policy: Policy retrying transient failures, a default one is used otherwise.
+			token_skew: Seconds before expiry at which the token is refreshed ahead of time.
+			token_cache: On-disk token cache, to reuse a still-valid token fetched by another process.
+			secrets_ttl: Seconds the client credentials are cached, so rotated ones are picked up at the next token fetch. Cached for the lifetime of the process when None.
+			applications: Number of OAuth applications to use, CLIENT_APPLICATIONS from the environment or 1 by default. Application n > 1 reads CLIENT_ID_n and CLIENT_SECRET_n.
+			metrics: Registry to record the requests in, to share with other clients. A new one is created by default.
+
+		Raises:
+			ValueError: If the client credentials can't be found.
+		"""
+		self._token_url = get_env().str("TOKEN_URL")
+		if applications is None:
+			applications = get_env().int("CLIENT_APPLICATIONS", 1)
+
+		self._credentials = CredentialPool([
+			Credential(
+				self._token_url,
+				secret_keys=credential_keys(index),
+				rate_limiter=rate_limiter if index == 1 else None,
+				token_skew=token_skew,
+				token_cache=token_cache,
+				secrets_ttl=secrets_ttl,
+			)
+			for index in range(1, applications + 1)
+		])
+		for credential in self._credentials:
+			credential.load_secrets()
+
+		self._http = httpx.AsyncClient(
+			limits=httpx.Limits(
+				max_connections=pool_size,
+				max_keepalive_connections=pool_size if keep_alive else 0,
+			),
+			timeout=httpx.Timeout(None),
+			transport=transport,
+		)
+		self._rate_limiter = RateLimiter()
+		self._retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+		self._metrics = metrics if metrics is not None else Metrics()
+
+		logger.info(f"Initializing AsyncFT_Client with {applications} application(s)...")
+
+	@property
+	def metrics(self) -> Metrics:
+		"""
+		Metrics of the requests sent so far, see `Metrics.summary` and `Metrics.write`.
+		"""
+		return self._metrics
+
+	@property
+	def credentials(self) -> CredentialPool:
+		"""
+		The applications the client authenticates with.
+		"""
+		return self._credentials
+
+	async def __aenter__(self):
+		for credential in self._credentials:
+			await credential.get_token_async(self)
+		return self
+
+	async def __aexit__(self, *exc_info) -> None:
+		await self.aclose()
+
+	async def aclose(self) -> None:
+		await self._http.aclose()
+
+	async def get_token(self) -> str:
+		"""
+		Retrieves a valid access token of the primary application, automatically refreshing if expired.
+
+		Concurrent tasks wait for a single refresh instead of each fetching their own token.
+
+		Returns:
+			str: The current valid access token.
+		"""
+		return await self._credentials.primary.get_token_async(self)
+
+	async def request(
+		self,
+		method: str,
+		url: str,
+		authenticate: bool = True,
+		rate_limited: bool = True,
+		headers: dict | None = None,
+		**kwargs,
+	) -> httpx.Response:
+		"""
+		Sends a rate-limited request through the pooled client, replaying it once with a fresh token after a 401.
+
+		Args:
+			method: HTTP method, such as "GET".
+			url: Full URL for the request.
+			authenticate: Whether a token from the credential pool should be injected.
+			rate_limited: Whether the request counts against the API's rate limit. Token requests don't.
+			headers: Extra headers, taking precedence over the default ones.
+			**kwargs: Any other argument accepted by `httpx.AsyncClient.request`.
+
+		Returns:
+			The `httpx.Response` for the request.
+		"""
+		request_headers = dict(headers or {})
+		sample = RequestSample(method.upper(), url)
+		try:
+			response = await self._send_with_retries(
+				method, url, request_headers, authenticate, rate_limited, kwargs, sample
+			)
+
+			if response.status_code == 401 and response.credential is not None:
+				logger.warning(f"Request to {url} was unauthorized. Replaying it with a fresh token...")
+				stale_token = response.request.headers.get("Authorization", "").removeprefix("Bearer ")
+				await response.credential.handle_unauthorized_async(stale_token, self)
+				sample.retries += 1
+				response = await self._send_with_retries(
+					method, url, request_headers, authenticate, rate_limited, kwargs, sample
+				)
+		except Exception as e:
+			sample.status = type(e).__name__
+			self._metrics.record(sample)
+			raise
+
+		sample.status = response.status_code
+		sample.size = len(response.content)
+		self._metrics.record(sample)
+		return response
+
+	async def _send(
+		self,
+		method: str,
+		url: str,
+		headers: dict,
+		authenticate: bool,
+		rate_limited: bool,
+		kwargs: dict,
+		sample: RequestSample,
+	) -> httpx.Response:
+		"""
+		Sends a request once, with the token of the application picked by the credential pool.
+
+		The application is chosen again on every attempt, so a retry after a 429 goes to another one. It is attached to the response as `response.credential`, None for unauthenticated requests. The time spent waiting for the budget and on the network is added to `sample`.
+		"""
+		credential = None
+		limiter = self._rate_limiter if rate_limited else None
+		waiting_since = time.perf_counter()
+		if authenticate:
+			if rate_limited:
+				credential = await self._credentials.acquire_async()
+				limiter = credential.rate_limiter
+			else:
+				credential = self._credentials.primary
+			headers = {"Authorization": f"Bearer {await credential.get_token_async(self)}", **headers}
+		elif limiter is not None:
+			await limiter.acquire_async()
+		sample.wait += time.perf_counter() - waiting_since
+
+		sent_at = time.perf_counter()
+		try:
+			with span("http_request", "network", method=method, endpoint=endpoint_label(url)) as args:
+				response = await self._http.request(method, url, headers=headers, **kwargs)
+				args["status"] = response.status_code
+		finally:
+			sample.latency += time.perf_counter() - sent_at
+
+		if limiter is not None:
+			limiter.update(response)
+		response.credential = credential
+		return response
+
+	async def _send_with_retries(
+		self,
+		method: str,
+		url: str,
+		headers: dict,
+		authenticate: bool,
+		rate_limited: bool,
+		kwargs: dict,
+		sample: RequestSample,
+	) -> httpx.Response:
+		"""
+		Sends a request, retrying transient statuses and transport errors as the retry policy allows.
+
+		The time spent backing off is added to `sample`.
+		"""
+		attempt = 0
+		while True:
+			try:
+				response = await self._send(
+					method, url, headers, authenticate, rate_limited, kwargs, sample
+				)
+			except httpx.TransportError as e:
+				if not self._retry_policy.should_retry(url, attempt, error=e):
+					raise
+				delay = self._retry_policy.backoff(attempt)
+				reason = type(e).__name__
+			else:
+				if not self._retry_policy.should_retry(
+					url, attempt, status_code=response.status_code
+				):
+					return response
+				retry_after = response.headers.get("Retry-After")
+				if response.status_code == 429 and len(self._credentials) > 1:
+					# The throttled application is held back by its own limiter, another one can take the retry.
+					retry_after = None
+				delay = self._retry_policy.backoff(attempt, retry_after)
+				reason = response.status_code
+
+			attempt += 1
+			sample.retries += 1
+			sample.backoff += delay
+			logger.warning(
+				f"Request to {url} failed ({reason}). Retry {attempt} in {delay:.2f}s..."
+			)
+			with span("retry_backoff", "wait", reason=reason, attempt=attempt):
+				await asyncio.sleep(delay)
+
+	async def get(self, url: str, **kwargs) -> httpx.Response:
+		return await self.request("GET", url, **kwargs)
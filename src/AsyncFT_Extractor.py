@@ -0,0 +1,250 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.resolve()))
+
+import asyncio
+import logging
+from collections import deque
+from typing import AsyncIterator, Callable, Iterable
+from AsyncFT_Client import AsyncFT_Client
+from helpers.codec import loads
+from helpers.config import api_url, setup_logging
+from helpers.metrics import extraction
+from helpers.tracing import span
+from helpers.models import Record, make_shaper
+from helpers.pagination import DEFAULT_PAGE_SIZE, build_params, parse_last_page
+
+setup_logging()
+
+class AsyncFT_Extractor(AsyncFT_Client):
+	"""
+	The asyncio counterpart of `FT_Extractor`, with the same extraction methods as coroutines.
+
+	Hundreds of extractions can run as tasks on one instance, for example the per-user fan-out:
+
+		>>> async with AsyncFT_Extractor() as extractor:
+		...     results = await asyncio.gather(*(
+		...         extractor.filtered_extraction(
+		...             "projects", "users/{user_id}/projects_users", {"user_id": user["id"]}
+		...         )
+		...         for user in users
+		...     ))
+	"""
+
+	def __init__(self, max_workers: int = 1, **client_options):
+		"""
+		Initializes the extractor and its underlying client.
+
+		Args:
+			max_workers: Default number of pages fetched concurrently once the page count is known.
+			**client_options: Connection pool options forwarded to `AsyncFT_Client`.
+		"""
+		super().__init__(**client_options)
+
+		self._base_url = api_url()
+		self._max_workers = max_workers
+		self._extractor_logger = logging.getLogger("AsyncFT_Extractor")
+		self._extractor_logger.info("Initializing AsyncFT_Extractor...")
+
+	async def _get_json_page(self, request_url: str, params: dict, page: int) -> list:
+		response = await self.get(request_url, params={**params, "page[number]": page})
+		response.raise_for_status()
+		return self._decode_page(response)
+
+	def _decode_page(self, response) -> list:
+		with span("json_decode", "cpu", bytes=len(response.content)) as args:
+			page_items = loads(response.content)
+			args["items"] = len(page_items)
+		self._metrics.add_items(str(response.url), len(page_items))
+		return page_items
+
+	async def get_pages(
+		self,
+		endpoint: str,
+		params: dict,
+	) -> int:
+		logger = self._extractor_logger
+		request_url = f"{self._base_url}{endpoint}"
+
+		logger.info(f"Checking pages for: {endpoint}...")
+
+		response = await self.get(request_url, params=params)
+		response.raise_for_status()
+
+		return parse_last_page(response.headers.get("Link"), logger)
+
+	async def iter_pages(
+		self,
+		endpoint: str,
+		params: dict,
+		logger: logging.Logger | None = None,
+		description: str | None = None,
+		max_workers: int | None = None,
+	) -> AsyncIterator[list]:
+		"""
+		Yields every page of a resource, reusing the first page as the `Link` header probe.
+
+		Args:
+			endpoint: Endpoint relative to the API base URL, such as "users".
+			params: Query params, as built by `build_params`. The page number is read from it.
+			logger: Logger used to report progress, defaults to the extractor's.
+			description: What is being extracted, used in the progress messages.
+			max_workers: Number of pages fetched concurrently after the first one, defaults to the extractor's.
+
+		Yields:
+			The decoded JSON list of each page, in page order.
+		"""
+		logger = logger or self._extractor_logger
+		description = description or f"{endpoint} data"
+		max_workers = max_workers or self._max_workers
+		request_url = f"{self._base_url}{endpoint}"
+		params = dict(params)
+		first_page = params["page[number]"]
+
+		logger.info(f"Checking pages for: {endpoint}...")
+		response = await self.get(request_url, params=params)
+		response.raise_for_status()
+
+		last_page = parse_last_page(response.headers.get("Link"), logger)
+
+		if last_page == 1:
+			logger.info(f"Extracting {description}...")
+		else:
+			logger.info(f"Extracting {description}, page {first_page}...")
+
+		page_items = self._decode_page(response)
+		yield page_items
+		if not page_items:
+			return
+
+		pending: deque[asyncio.Task] = deque()
+		next_page = first_page + 1
+		window = max_workers * 2 if max_workers > 1 else 1
+
+		try:
+			while pending or next_page <= last_page:
+				while next_page <= last_page and len(pending) < window:
+					logger.info(f"Extracting {description}, page {next_page}...")
+					pending.append(
+						asyncio.create_task(
+							self._get_json_page(request_url, params, next_page)
+						)
+					)
+					next_page += 1
+
+				page_items = await pending.popleft()
+				yield page_items
+				if not page_items and max_workers == 1:
+					return
+		finally:
+			for task in pending:
+				task.cancel()
+			await asyncio.gather(*pending, return_exceptions=True)
+
+	async def iter_items(
+		self,
+		endpoint: str,
+		page_size: int = DEFAULT_PAGE_SIZE,
+		limit: int | None = None,
+		stop: Callable[[dict | Record], bool] | None = None,
+		logger: logging.Logger | None = None,
+		description: str | None = None,
+		max_workers: int | None = None,
+		fields: Iterable[str] | None = None,
+		model: type[Record] | None = None,
+		**kwargs,
+	) -> AsyncIterator[dict | Record]:
+		"""
+		Lazily yields the items of a resource, fetching pages only as they are consumed.
+
+		Args:
+			endpoint: Endpoint relative to the API base URL.
+			page_size: Number of items requested per page.
+			limit: Maximum number of items to yield before stopping.
+			stop: Predicate called on each item; the iteration stops, without yielding it, on the first True.
+			logger: Logger used to report progress.
+			description: What is being extracted, used in the progress messages.
+			max_workers: Number of pages fetched concurrently, defaults to the extractor's.
+			fields: Names or dotted paths of the fields to keep, dropping the rest of each item as its page is decoded.
+			model: Record model, such as `User`, each item is turned into instead of a dict.
+			**kwargs: Query params, such as "filter[pool_year]". The ones with a None value are dropped.
+
+		Yields:
+			Each item of the resource, in API order, projected or modelled when asked to.
+		"""
+		if limit is not None and limit <= 0:
+			return
+
+		shape = make_shaper(fields, model)
+		params = build_params(page_size, **kwargs)
+		yielded = 0
+		pages = self.iter_pages(endpoint, params, logger, description, max_workers)
+		try:
+			async for page_items in pages:
+				if shape is not None:
+					page_items = [shape(item) for item in page_items]
+				for item in page_items:
+					if stop is not None and stop(item):
+						return
+					yield item
+					yielded += 1
+					if limit is not None and yielded >= limit:
+						return
+		finally:
+			await pages.aclose()
+
+	async def basic_extraction(
+		self, endpoint: str, max_workers: int | None = None, **kwargs
+	) -> list:
+		logger = logging.getLogger(name=f"{endpoint.upper()}_EXTRACTION")
+		extract_subject = "".join(endpoint.replace("_", " ").title())
+
+		with extraction(endpoint), span("basic_extraction", endpoint=endpoint) as args:
+			all_items = [
+				item
+				async for item in self.iter_items(
+					endpoint,
+					logger=logger,
+					description=f"{extract_subject} data",
+					max_workers=max_workers,
+					**kwargs,
+				)
+			]
+			args["items"] = len(all_items)
+
+		logger.info("Returning found data...")
+		return all_items
+
+	async def filtered_extraction(
+		self,
+		extraction_name: str,
+		endpoint: str,
+		path_dictionary: dict,
+		max_workers: int | None = None,
+		**kwargs,
+	) -> list:
+		logger = logging.getLogger(f"{extraction_name.upper()}_EXTRACTION")
+
+		endpoint_format = endpoint.format(**path_dictionary)
+
+		msg_fmt = "".join(endpoint_format.split("/")[-1].replace("_", " ").title())
+		path_fmt = "".join(f"{key}: {value}" for key, value in path_dictionary.items())
+
+		with extraction(extraction_name), span(
+			"filtered_extraction", endpoint=endpoint_format, path=path_dictionary
+		) as args:
+			all_items = [
+				item
+				async for item in self.iter_items(
+					endpoint_format,
+					logger=logger,
+					description=f"{msg_fmt} data from {path_fmt}",
+					max_workers=max_workers,
+					**kwargs,
+				)
+			]
+			args["items"] = len(all_items)
+
+		logger.info("Returning found data...")
+		return all_items
@@ -4,16 +4,22 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent.resolve()))
 
 import logging
-import requests
-import time
-import os
-from environs import env
-from google.api_core import exceptions
-from google.cloud import secretmanager
-
-logging.basicConfig(
-	level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+from requests.adapters import BaseAdapter
+from helpers.cache import ResponseCache
+from helpers.config import get_env, setup_logging
+from helpers.metrics import Metrics
+from helpers.credentials import (
+	DEFAULT_TOKEN_SKEW,
+	Credential,
+	CredentialPool,
+	credential_keys,
 )
+from helpers.retry import RetryPolicy
+from helpers.secrets import get_secret, get_secrets, on_cloud
+from helpers.session import APISession, DEFAULT_POOL_SIZE
+from helpers.token_cache import TokenCache
+
+setup_logging()
 
 logger = logging.getLogger("FT_Client")
 
@@ -25,50 +31,91 @@ class FT_Client:
 	to the current access token. It's designed for APIs that use OAuth2 client credentials
 	grant type.
 
+	The 42 API rate-limits each OAuth application separately, so the client can authenticate
+	with several of them at once: every request goes to the application with the most budget
+	left, and throughput grows with the number of applications.
+
 	Attributes:
-		_client_id (str): The OAuth2 client ID (kept private).
-		_client_secret (str): The OAuth2 client secret (kept private).
 		_token_url (str): The endpoint URL for token requests.
-		_token_data (dict|None): Stores token and metadata. Format:
-			{
-				"token": str,  # The access token
-				"metadata": dict  # Full token response from server
-			}
-		_expires_in (float|None): Unix timestamp when the current token expires.
+		_secrets_ttl (float|None): Seconds the client credentials are cached before being resolved again.
+		_credentials (CredentialPool): The applications the client authenticates with, each with its own token and rate limiter.
+		_session (APISession): Pooled HTTP session shared by every request of the client.
+		_metrics (Metrics): Metrics of every request sent by the client.
 	"""
 
-	def __init__(self):
+	def __init__(
+		self,
+		pool_size: int = DEFAULT_POOL_SIZE,
+		keep_alive: bool = True,
+		transport: BaseAdapter | None = None,
+		cache: ResponseCache | None = None,
+		retry_policy: RetryPolicy | None = None,
+		token_skew: float = DEFAULT_TOKEN_SKEW,
+		token_cache: TokenCache | None = None,
+		secrets_ttl: float | None = None,
+		applications: int | None = None,
+		metrics: Metrics | None = None,
+	):
 		"""
-		Initializes the client and fetches the first access token.
+		Initializes the client and fetches the first access token of every application.
 
 		Args:
-			client_id: OAuth2 client identifier.
-			client_secret: OAuth2 client secret.
-			token_url: Full URL to the OAuth2 token endpoint.
+			pool_size: Maximum number of kept-alive connections to the API.
+			keep_alive: Whether connections are reused between requests.
+			transport: Custom `requests` adapter to mount instead of the default pooled one.
+			cache: Optional on-disk cache for GET requests to rarely changing endpoints.
+			retry_policy: Policy retrying transient failures, a default one is used otherwise.
+			token_skew: Seconds before expiry at which the token is refreshed ahead of time.
+			token_cache: On-disk token cache, to reuse a still-valid token fetched by another process.
+			secrets_ttl: Seconds the client credentials are cached, so rotated ones are picked up at the next token fetch. Cached for the lifetime of the process when None.
+			applications: Number of OAuth applications to use, CLIENT_APPLICATIONS from the environment or 1 by default. Application n > 1 reads CLIENT_ID_n and CLIENT_SECRET_n.
+			metrics: Registry to record the requests in, to share with other clients. A new one is created by default.
 
 		Raises:
 			requests.HTTPError: If the initial token request fails.
 		"""
-		self._token_data = None
-		self._expires_in = None
-		self._secrets_cache = {}
-		self._client_id = None
-		self._client_secret = None
-		self._token_url = None
-
-		env.read_env()
-
-		self._client_id = self._get_secret("CLIENT_ID")
-		self._client_secret = self._get_secret("CLIENT_SECRET")
-		self._token_url = env.str("TOKEN_URL")
-
-		logger.info("Initializing FT_Client...")
-		self._fetch_token()
+		self._token_url = get_env().str("TOKEN_URL")
+		self._secrets_ttl = secrets_ttl
+		self._metrics = metrics if metrics is not None else Metrics()
+
+		if applications is None:
+			applications = get_env().int("CLIENT_APPLICATIONS", 1)
+
+		self._credentials = CredentialPool([
+			Credential(
+				self._token_url,
+				secret_keys=credential_keys(index),
+				token_skew=token_skew,
+				token_cache=token_cache,
+				secrets_ttl=secrets_ttl,
+			)
+			for index in range(1, applications + 1)
+		])
+		self._session = APISession(
+			pool_size=pool_size,
+			keep_alive=keep_alive,
+			transport=transport,
+			credentials=self._credentials,
+			cache=cache,
+			retry_policy=retry_policy,
+			metrics=self._metrics,
+		)
+
+		get_secrets(
+			[key for index in range(1, applications + 1) for key in credential_keys(index)],
+			session=self._session,
+			ttl=secrets_ttl,
+		)
+
+		logger.info(f"Initializing FT_Client with {applications} application(s)...")
+		for credential in self._credentials:
+			credential.load_secrets(self._session)
+			credential.get_token(self._session)
 
 	@property
 	def token(self) -> str:
 		"""
-		The current access token (auto-refreshes if expired).
+		The current access token of the primary application (auto-refreshes if expired).
 
 		Example:
 			>>> client = FT_Client(...)
@@ -76,120 +123,46 @@ class FT_Client:
 		"""
 		return self.get_token()
 
+	@property
+	def session(self) -> APISession:
+		"""
+		The pooled HTTP session, injecting the Authorization header by default.
+		"""
+		return self._session
+
+	@property
+	def metrics(self) -> Metrics:
+		"""
+		Metrics of the requests sent so far, see `Metrics.summary` and `Metrics.write`.
+		"""
+		return self._metrics
+
+	@property
+	def credentials(self) -> CredentialPool:
+		"""
+		The applications the client authenticates with.
+		"""
+		return self._credentials
+
 	def get_token(self) -> str:
 		"""
-		Retrieves a valid access token, automatically refreshing if expired.
+		Retrieves a valid access token of the primary application, refreshing it shortly before it expires.
 
 		Returns:
 			str: The current valid access token.
 
 		Note:
-			Prints a message to stdout when refreshing expired tokens. In production,
-			consider using logging instead.
+			Safe to call from several threads: only one of them refreshes the token.
 
 		Example:
-			>>> client = FT_Client("id", "secret", "https://api.example.com/token")
+			>>> client = FT_Client()
 			>>> token = client.get_token()  # Gets token, auto-refreshes if needed
 		"""
-		if not self._token_data or time.time() >= self._expires_in:
-			logger.warning("Token expired or missing. Refreshing...")
-			self._fetch_token()
-		return self._token_data["token"]
-
-	def _fetch_token(self) -> None:
-		"""
-		Fetches a new access token from the OAuth2 server and stores it.
-
-		Uses client credentials flow with application/x-www-form-urlencoded content type.
-		Updates both the token data and expiration timestamp.
-
-		Raises:
-			requests.HTTPError: If the token request fails (4xx/5xx status).
-			ValueError: If the token response is malformed.
-		"""
-		try:
-			payload = {
-				"grant_type": "client_credentials",
-				"client_id": self._client_id,
-				"client_secret": self._client_secret,
-			}
-
-			headers = {"Content-Type": "application/x-www-form-urlencoded"}
-
-			logger.debug(f"Requesting new token from {self._token_url}")
-			response = requests.post(self._token_url, data=payload, headers=headers)
-			response.raise_for_status()
-
-			token_info = response.json()
-			self._token_data = {
-				"token": token_info["access_token"],
-				"metadata": token_info,
-			}
-
-			self._expires_in = time.time() + token_info["expires_in"]
-			logger.info(
-				"Successfully fetched new token. "
-				f"Expires in {token_info['expires_in']} seconds."
-			)
-		except requests.RequestException as e:
-			logger.error(f"Token fetch failed: {str(e)}", exc_info=True)
-			raise
-		
+		return self._credentials.primary.get_token(self._session)
 
 	def _on_cloud(self):
-		return os.getenv("K_SERVICE") is not None
+		return on_cloud()
 	
-	def	_get_secret(self, secret_id: str, version:str = "latest") -> str:
-			cache_key = f"{secret_id}_{version}"
-			
-			if cache_key in self._secrets_cache:
-				logger.debug(f"Cache hit for secret: {cache_key}")
-				return self._secrets_cache[cache_key]
-			
-			secret_value = None
-
-			if self._on_cloud():
-				logger.info(f"Trying to fetch secret '{secret_id}' from Secret Manager.")
-
-				try:
-					project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
-					if not project_id:
-						project_id = requests.get(
-							'http://metadata.google.internal/computeMetadata/v1/project/project-id',
-							headers={
-								'Metadata-Flavor': 'Google'
-							}
-						).text
-					
-					client = secretmanager.SecretManagerServiceClient()
-					name = f"projects/{project_id}/secrets/{secret_id}/versions/{version}"
-					response = client.access_secret_version(request={"name": name})
-					secret_value = response.payload.data.decode("UTF-8")
-
-					logger.info(f"Successfully fetched secret '{secret_id}' from Secret Manager!")
-				
-				except exceptions.NotFound:
-					logger.error(f"Secret '{secret_id}' not found.")
-				except exceptions.PermissionDenied:
-					logger.error(f"Permission denied for secret '{secret_id}'. Check IAM Permission for the Service Account.")
-				except Exception as e:
-					logger.warning(f"Unexpected error fetching secret from SM: {str(e)}. Falling back to local env.")
-			
-			if secret_value is None:
-				logger.info(f"Executin' local fetch for secret '{secret_id}'...")
-
-				secret_value = env.str(secret_id, None)
-				if secret_value is None:
-					err_msg = (
-						f"Secret '{secret_id}' could not be found."
-						f"Checked: {'Secret Manager' if self._on_cloud() else ''}"
-						f"local environment variables, and .env file..."
-					)
-					
-					logger.error(err_msg)
-					raise ValueError(err_msg)
-				else:
-					logger.info(f"Found secret '{secret_id}' in local environment.")
-			
-			self._secrets_cache[cache_key] = secret_value
-			return secret_value
\ No newline at end of file
+	def _get_secret(self, secret_id: str, version: str = "latest") -> str:
+		return get_secret(secret_id, version, session=self._session, ttl=self._secrets_ttl)
+
@@ -1,29 +1,78 @@
-import re
 import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent.resolve()))
 
 import logging
-import requests
-import time
-import json
+import threading
+import os
+from datetime import datetime, timezone
+from typing import Callable, Hashable, Iterable, Iterator
 from FT_Client import FT_Client
-from environs import env
-
-logging.basicConfig(
-	level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+from helpers.batching import (
+	DEFAULT_BATCH_SIZE,
+	chunk_ids,
+	filter_length_budget,
+	group_items,
 )
+from helpers.config import api_url, setup_logging
+from helpers.checkpoint import CheckpointJournal, unit_key
+from helpers.codec import loads
+from helpers.metrics import extraction
+from helpers.models import Record, make_shaper
+from helpers.projection import get_path, project
+from helpers.readers import get_record, iter_records
+from helpers.pagination import DEFAULT_PAGE_SIZE, Paginator, build_params
+from helpers.session import DEFAULT_POOL_SIZE
+from helpers.sinks import NDJSONWriter, write_json_atomic
+from helpers.store import SQLiteStore
+from helpers.tracing import span
+from helpers.watermarks import WatermarkStore, latest_update, watermark_key
+
+setup_logging()
 
 DATA_DIR = "data"
 
-class FT_Extractor(FT_Client):
-	def __init__(self):
-		env.read_env()	
-		super().__init__()
 
-		self._base_url = env.str("REQ_URL")
+def ndjson_path(file_name: str, compress: bool = False) -> str:
+	return f"{DATA_DIR}/{file_name}.ndjson{'.gz' if compress else ''}"
+
+
+class FT_Extractor(FT_Client):
+	def __init__(
+		self,
+		max_workers: int = 1,
+		keyset: bool = False,
+		store: SQLiteStore | None = None,
+		pretty_json: bool = False,
+		**client_options,
+	):
+		"""
+		Initializes the extractor and its underlying client.
+
+		Args:
+			max_workers: Default number of pages fetched concurrently once the page count is known. 1 fetches them one at a time.
+			keyset: Whether items are paginated by id range instead of page number by default, see `Paginator.iter_keyset_pages`.
+			store: SQLite store `save`, `load` and incremental extractions use instead of JSON files.
+			pretty_json: Whether JSON files are written indented instead of compact.
+			**client_options: Connection pool options forwarded to `FT_Client`.
+		"""
+		client_options.setdefault("pool_size", max(DEFAULT_POOL_SIZE, max_workers))
+		super().__init__(**client_options)
+
+		self._base_url = api_url()
+		self._store = store
+		self._pretty_json = pretty_json
+		self._watermarks = None
+		self._watermarks_lock = threading.Lock()
 		self._extractor_logger = logging.getLogger("FT_Extractor")
+		self._paginator = Paginator(
+			self._session,
+			self._base_url,
+			max_workers,
+			keyset,
+			logger=self._extractor_logger,
+		)
 		self._extractor_logger.info("Initializing FT_Extractor...")
 
 	def get_pages(
@@ -31,159 +80,508 @@ class FT_Extractor(FT_Client):
 		endpoint: str,
 		params: dict,
 	) -> int:
-		logger = self._extractor_logger
-		headers = {"Authorization": f"Bearer {self.token}"}
-		request_url = f"{self._base_url}{endpoint}"
-
-		logger.info(f"Checking pages for: {endpoint}...")
-
-		response = requests.get(request_url, headers=headers, params=params)
-		response.raise_for_status()
-
-		last_page = None
-		link_header = response.headers.get("Link")
-		if link_header:
-			logger.info(f"Link header found: {link_header}")
+		return self._paginator.get_pages(endpoint, params)
 
-			match = re.search(r'<[^>]*page=(\d+)[^>]*>;\s*rel="last"', link_header)
-			if match:
-				last_page = int(match.group(1))
-				logger.info(f"I've found {last_page} pages!")
-			else:
-				logger.info(
-					"No 'last' relation found in Link header. Assuming single page."
-				)
-				last_page = 1
-		else:
-			logger.warning("No Link header. Assuming only one page.")
-			last_page = 1
+	def iter_pages(
+		self,
+		endpoint: str,
+		params: dict,
+		logger: logging.Logger | None = None,
+		description: str | None = None,
+		max_workers: int | None = None,
+		shape: Callable[[dict], object] | None = None,
+	) -> Iterator[list]:
+		"""
+		Yields every page of a resource, one list of items at a time, see `Paginator.iter_pages`.
+		"""
+		return self._paginator.iter_pages(endpoint, params, logger, description, max_workers, shape)
 
-		self.wait()
-		return last_page
+	def iter_keyset_pages(
+		self,
+		endpoint: str,
+		params: dict,
+		logger: logging.Logger | None = None,
+		description: str | None = None,
+		shape: Callable[[dict], object] | None = None,
+	) -> Iterator[list]:
+		"""
+		Yields every page of a resource through keyset pagination, see `Paginator.iter_keyset_pages`.
+		"""
+		return self._paginator.iter_keyset_pages(endpoint, params, logger, description, shape)
 
-	def basic_extraction(self, endpoint: str, **kwargs):
+	def iter_items(
+		self,
+		endpoint: str,
+		page_size: int = DEFAULT_PAGE_SIZE,
+		limit: int | None = None,
+		stop: Callable[[dict | Record], bool] | None = None,
+		logger: logging.Logger | None = None,
+		description: str | None = None,
+		max_workers: int | None = None,
+		fields: Iterable[str] | None = None,
+		model: type[Record] | None = None,
+		keyset: bool | None = None,
+		**kwargs,
+	) -> Iterator[dict | Record]:
+		"""
+		Lazily yields the items of a resource, fetching pages only as they are consumed, see `Paginator.iter_items`.
+		"""
+		return self._paginator.iter_items(
+			endpoint,
+			page_size,
+			limit,
+			stop,
+			logger,
+			description,
+			max_workers,
+			fields,
+			model,
+			keyset,
+			**kwargs,
+		)
+
+	def basic_extraction(
+		self, endpoint: str, max_workers: int | None = None, **kwargs
+	) -> list:
 		logger = logging.getLogger(name=f"{endpoint.upper()}_EXTRACTION")
-		headers = {"Authorization": f"Bearer {self.token}"}
-		start_page = 1
-
-		params = {"page[number]": start_page, "page[size]": 100}
-
-		if kwargs:
-			for key, value in kwargs.items():
-				if value is not None:
-					params[key] = value
-
-		last_page = self.get_pages(endpoint, params)
-		total_pages = last_page
-
-		total_data = []
-		request_url = f"{self._base_url}{endpoint}"
 		extract_subject = "".join(endpoint.replace("_", " ").title())
-		if start_page == total_pages:
-			logger.info(f"Extracting {extract_subject} data...")
-			response = requests.get(request_url, headers=headers, params=params)
-			response.raise_for_status()
-			total_data.append(response.json())
 
-		else:
-			while params["page[number]"] <= total_pages:
-				logger.info(
-					f"Extracting data from {extract_subject}, page {params['page[number]']}..."
+		with extraction(endpoint), span("basic_extraction", endpoint=endpoint) as args:
+			all_items = list(
+				self.iter_items(
+					endpoint,
+					logger=logger,
+					description=f"{extract_subject} data",
+					max_workers=max_workers,
+					**kwargs,
 				)
-				response = requests.get(request_url, headers=headers, params=params)
-				response.raise_for_status()
-				total_data.append(response.json())
-				params["page[number]"] += 1
-				self.wait()
+			)
+			args["items"] = len(all_items)
 
 		logger.info("Returning found data...")
-
-		all_items = []
-		for response in total_data:
-			all_items.extend(response)
-
-		if len(all_items) == 1:
-			return all_items[0]
-		else:
-			return all_items
+		return all_items
 
 	def filtered_extraction(
 		self,
 		extraction_name: str,
 		endpoint: str,
 		path_dictionary: dict,
+		max_workers: int | None = None,
 		**kwargs,
-	):
+	) -> list:
 		logger = logging.getLogger(f"{extraction_name.upper()}_EXTRACTION")
-		headers = {"Authorization": f"Bearer {self.token}"}
 
 		endpoint_format = endpoint.format(**path_dictionary)
 
-		start_page = 1
-		params = {"page[number]": start_page, "page[size]": 100}
+		msg_fmt = "".join(endpoint_format.split("/")[-1].replace("_", " ").title())
+		path_fmt = "".join(f"{key}: {value}" for key, value in path_dictionary.items())
+
+		with extraction(extraction_name), span(
+			"filtered_extraction", endpoint=endpoint_format, path=path_dictionary
+		) as args:
+			all_items = list(
+				self.iter_items(
+					endpoint_format,
+					logger=logger,
+					description=f"{msg_fmt} data from {path_fmt}",
+					max_workers=max_workers,
+					**kwargs,
+				)
+			)
+			args["items"] = len(all_items)
+
+		logger.info("Returning found data...")
+		return all_items
 
-		if kwargs:
-			for key, value in kwargs.items():
-				if value is not None:
-					params[key] = value
+	def batched_extraction(
+		self,
+		endpoint: str,
+		filter_key: str,
+		ids: Iterable,
+		group_by: Callable[[dict], Hashable],
+		max_ids: int = DEFAULT_BATCH_SIZE,
+		items_per_id: int | None = None,
+		max_workers: int | None = None,
+		journal: CheckpointJournal | None = None,
+		fields: Iterable[str] | None = None,
+		model: type[Record] | None = None,
+		**kwargs,
+	) -> dict:
+		"""
+		Fans out over many ids with comma-separated filters instead of one extraction per id.
+
+		The ids are packed into `filter[<filter_key>]=a,b,c` requests, chunked so every URL stays under the length limit, and the items are regrouped per id afterwards.
+
+		Example:
+			>>> projects_by_user = extractor.batched_extraction(
+			...     "projects_users", "user_id", user_ids, lambda item: item["user"]["id"]
+			... )
+
+		Args:
+			endpoint: Endpoint accepting the filter, such as "projects_users".
+			filter_key: Name of the filter the ids are packed into, such as "user_id".
+			ids: Ids to fetch the items of.
+			group_by: Function returning the id an item belongs to.
+			max_ids: Maximum number of ids per request.
+			items_per_id: Expected number of items per id, used to keep each chunk's pagination shallow.
+			max_workers: Number of pages fetched concurrently within a chunk.
+			journal: Checkpoint journal recording each completed chunk. Chunks it already holds are replayed instead of requested.
+			fields: Names or dotted paths of the fields to keep; `group_by` sees the projected items.
+			model: Record model the items are turned into; `group_by` sees the records.
+			**kwargs: Extra query params, such as "filter[cursus_id]".
+
+		Returns:
+			A dictionary mapping every requested id, even those without items, to its list of items.
+		"""
+		logger = logging.getLogger(f"{endpoint.upper()}_BATCHED_EXTRACTION")
+		ids = list(dict.fromkeys(ids))
+		grouped = {item_id: [] for item_id in ids}
+
+		filter_name = f"filter[{filter_key}]"
+		max_length = filter_length_budget(
+			f"{self._base_url}{endpoint}", build_params(**kwargs), filter_name
+		)
+
+		chunks = list(chunk_ids(ids, max_ids, max_length, items_per_id))
+		logger.info(f"Packing {len(ids)} ids into {len(chunks)} requests...")
+
+		for number, chunk in enumerate(chunks, start=1):
+			chunk_params = {
+				**kwargs,
+				filter_name: ",".join(str(item_id) for item_id in chunk),
+			}
+			key = unit_key(endpoint, chunk_params)
+
+			if journal is not None and journal.is_done(key):
+				logger.info(f"Batch {number}/{len(chunks)} already done, replaying it...")
+				items = journal.results(key)
+				if model is not None:
+					items = [
+						item if isinstance(item, model) else model.from_json(item)
+						for item in items
+					]
+				group_items(items, group_by, grouped)
+				continue
+
+			with extraction(endpoint), span(
+				"batch", endpoint=endpoint, number=number, ids=len(chunk)
+			) as args:
+				items = list(
+					self.iter_items(
+						endpoint,
+						logger=logger,
+						description=f"{endpoint} data for batch {number}/{len(chunks)}",
+						max_workers=max_workers,
+						fields=fields,
+						model=model,
+						**chunk_params,
+					)
+				)
+				args["items"] = len(items)
+			if journal is not None:
+				journal.record(key, items)
+			group_items(items, group_by, grouped)
 
-		total_data = []
-		last_page = self.get_pages(f"{endpoint_format}", params=params)
-		total_pages = last_page
+		logger.info("Returning found data...")
+		return grouped
 
-		msg_fmt = "".join(endpoint_format.split("/")[-1].replace("_", " ").title())
+	@property
+	def watermarks(self) -> WatermarkStore:
+		"""
+		The `updated_at` high-water marks of incremental extractions, loaded on first use.
+		"""
+		if self._watermarks is None:
+			with self._watermarks_lock:
+				if self._watermarks is None:
+					self._watermarks = WatermarkStore(f"{DATA_DIR}/watermarks.json")
+		return self._watermarks
 
-		if start_page == total_pages:
-			logger.info(
-				f"Extracting {msg_fmt} data from {''.join(f'{key}: {value}' for key, value in path_dictionary.items())}..."
-			)
-			response = requests.get(
-				f"{self._base_url}{endpoint_format}", headers=headers, params=params
-			)
-			response.raise_for_status()
-			total_data.append(response.json())
+	def incremental_extraction(
+		self,
+		file_name: str,
+		endpoint: str,
+		full_refresh: bool = False,
+		max_workers: int | None = None,
+		fields: Iterable[str] | None = None,
+		model: type[Record] | None = None,
+		**kwargs,
+	) -> list:
+		"""
+		Updates the `file_name` snapshot with only the records changed since the previous run.
 
+		The high-water mark is the greatest `updated_at` seen for the (endpoint, filters) pair. Later runs request `range[updated_at]=<mark>,<now>` and merge the changed records into the snapshot by id. The boundary record is fetched again, which the merge makes harmless. Records deleted upstream are only dropped by a full refresh.
+
+		Args:
+			file_name: Name of the JSON snapshot in the data directory, without extension.
+			endpoint: Endpoint relative to the API base URL, such as "users".
+			full_refresh: Whether to ignore the watermark and download everything again.
+			max_workers: Number of pages fetched concurrently.
+			fields: Names or dotted paths of the fields to keep. "id" and "updated_at" are always kept, the merge needs them.
+			model: Record model the items are turned into. It must have "id" and "updated_at" fields.
+			**kwargs: Query params, such as "filter[pool_year]".
+
+		Returns:
+			The merged snapshot, as written to disk.
+		"""
+		logger = logging.getLogger(f"{endpoint.upper()}_INCREMENTAL_EXTRACTION")
+		key = watermark_key(endpoint, kwargs)
+		watermark = self.watermarks.get(key)
+		if self._store is not None:
+			has_snapshot = self._store.has(file_name)
 		else:
-			while params["page[number]"] <= total_pages:
-				logger.info(
-					f"Extracting {msg_fmt} data from: {''.join(f'{key}: {value}' for key, value in path_dictionary.items())} page {params['page[number]']}..."
+			has_snapshot = os.path.isfile(f"{DATA_DIR}/{file_name}.json")
+		if fields is not None:
+			fields = list(dict.fromkeys(["id", "updated_at", *fields]))
+
+		if full_refresh or watermark is None or not has_snapshot:
+			logger.info(f"Running a full extraction for {key}...")
+			with extraction(file_name):
+				data = self.basic_extraction(
+					endpoint, max_workers=max_workers, fields=fields, model=model, **kwargs
 				)
-				response = requests.get(
-					f"{self._base_url}{endpoint_format}", headers=headers, params=params
+			watermark = latest_update(data)
+			self.save(file_name, data)
+		else:
+			now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+			logger.info(f"Fetching {key} records updated since {watermark}...")
+			with extraction(file_name):
+				changes = self.basic_extraction(
+					endpoint,
+					max_workers=max_workers,
+					fields=fields,
+					model=model,
+					**kwargs,
+					**{"range[updated_at]": f"{watermark},{now}"},
+				)
+
+			if self._store is not None:
+				with span("store_upsert", "io", dataset=file_name, records=len(changes)):
+					self._store.upsert(file_name, changes)
+					data = list(self._store.query(file_name, model=model))
+			else:
+				snapshot = self.get_json_data(file_name)
+				if model is not None:
+					snapshot = [model.from_json(item) for item in snapshot]
+				merged = {item["id"]: item for item in snapshot}
+				merged.update((item["id"], item) for item in changes)
+				data = list(merged.values())
+				self.set_json(file_name, data, self._pretty_json)
+			watermark = latest_update(changes, watermark)
+
+			logger.info(f"Merged {len(changes)} changed records into {file_name}.")
+
+		if watermark is not None:
+			self.watermarks.set(key, watermark)
+
+		return data
+
+	def extract_to_ndjson(
+		self,
+		file_name: str,
+		endpoint: str,
+		compress: bool = False,
+		max_workers: int | None = None,
+		resume: bool = False,
+		fields: Iterable[str] | None = None,
+		model: type[Record] | None = None,
+		**kwargs,
+	) -> int:
+		"""
+		Streams every item of a resource to `data/<file_name>.ndjson`, one page at a time.
+
+		Only the page being written is held in memory, whatever the size of the resource. Every page is also journaled until the file is published, so `resume=True` after a crash replays the pages already fetched and only requests the rest.
+
+		Args:
+			file_name: Name of the output file in the data directory, without extension.
+			endpoint: Endpoint relative to the API base URL.
+			compress: Whether to gzip the output, adding ".gz" to its name.
+			max_workers: Number of pages fetched concurrently.
+			resume: Whether to pick up the journal left by a previous, interrupted run.
+			fields: Names or dotted paths of the fields to keep in the file.
+			model: Record model whose fields are kept in the file.
+			**kwargs: Query params, such as "filter[pool_year]".
+
+		Returns:
+			The number of items written.
+		"""
+		logger = logging.getLogger(name=f"{endpoint.upper()}_EXTRACTION")
+		extract_subject = "".join(endpoint.replace("_", " ").title())
+		params = build_params(**kwargs)
+		journal = self.checkpoint(file_name, resume)
+
+		with NDJSONWriter(ndjson_path(file_name, compress), compress) as writer:
+			while journal.is_done(unit_key(endpoint, params, params["page[number]"])):
+				writer.write_many(
+					journal.results(unit_key(endpoint, params, params["page[number]"]))
 				)
-				response.raise_for_status()
-				total_data.append(response.json())
 				params["page[number]"] += 1
-				self.wait()
 
-		logger.info("Returning found data...")
+			if params["page[number]"] > 1:
+				logger.info(
+					f"Replayed {params['page[number]'] - 1} pages from the checkpoint journal."
+				)
 
-		all_items = []
-		for response in total_data:
-			all_items.extend(response)
+			page = params["page[number]"]
+			with extraction(file_name), span("extract_to_ndjson", file=file_name):
+				for page_items in self.iter_pages(
+					endpoint,
+					params,
+					logger,
+					f"{extract_subject} data",
+					max_workers,
+					make_shaper(fields, model),
+				):
+					journal.record(unit_key(endpoint, params, page), page_items)
+					writer.write_many(page_items)
+					page += 1
+
+		journal.clear()
+		logger.info(f"Wrote {writer.count} items to {writer.path}.")
+		return writer.count
+
+	@property
+	def store(self) -> SQLiteStore | None:
+		return self._store
+
+	def save(self, file_name: str, data) -> None:
+		"""
+		Saves a dataset to the SQLite store when the extractor has one, as a JSON file otherwise.
 
-		if len(all_items) == 1:
-			return all_items[0]
-		else:
-			return all_items
+		Args:
+			file_name: Name of the dataset.
+			data: A list of records, or a single record.
+		"""
+		if self._store is None:
+			self.set_json(file_name, data, self._pretty_json)
+			return
+
+		records = data if isinstance(data, list) else [data]
+		with span("store_replace", "io", dataset=file_name, records=len(records)):
+			written = self._store.replace(file_name, records)
+		self._extractor_logger.info(f"Stored {written} records in {file_name}.")
+
+	def load(
+		self,
+		file_name: str,
+		fields: Iterable[str] | None = None,
+		model: type[Record] | None = None,
+		**filters,
+	) -> Iterator[dict | Record]:
+		"""
+		Iterates the records of a dataset matching equality filters, in place of `get_json_data`.
+
+		Datasets in the SQLite store are read through its indexes; otherwise the JSON or NDJSON file is streamed and filtered record by record.
+
+		Example:
+			>>> campus = next(extractor.load("campus_data"))
+			>>> user_ids = [user["id"] for user in extractor.load("piscines_2025_users", fields=["id"])]
+
+		Args:
+			file_name: Name of the dataset.
+			fields: Names or dotted paths of the fields to keep.
+			model: Record model the records are loaded into.
+			**filters: Field values to match, see `SQLiteStore.query`.
+
+		Yields:
+			Each matching record.
+		"""
+		if self._store is not None and self._store.has(file_name):
+			yield from self._store.query(file_name, fields=fields, model=model, **filters)
+			return
+
+		filters = {key.replace("__", "."): value for key, value in filters.items()}
+		fields = list(fields) if fields is not None else None
+		for record in iter_records(self.data_path(file_name)):
+			if not all(
+				get_path(record, key) in value
+				if isinstance(value, (list, tuple, set, frozenset))
+				else get_path(record, key) == value
+				for key, value in filters.items()
+			):
+				continue
+			if fields is not None:
+				record = project(record, fields)
+			yield model.from_json(record) if model is not None else record
+
+	@staticmethod
+	def checkpoint(job_name: str, resume: bool = False) -> CheckpointJournal:
+		"""
+		Opens the checkpoint journal of a job, in the data directory.
+
+		Args:
+			job_name: Name identifying the job across runs.
+			resume: Whether to keep the units completed by a previous run instead of starting over.
+		"""
+		return CheckpointJournal.for_job(job_name, resume, f"{DATA_DIR}/.checkpoints")
 
 	@staticmethod
-	def set_json(file_name: str, data: str) -> None:
-		with open(f"{DATA_DIR}/{file_name}.json", "w", encoding="utf-8") as f:
-			json.dump(data, f, ensure_ascii=False, indent=4)
+	def set_ndjson(file_name: str, records: Iterable, compress: bool = False) -> int:
+		with span("write_ndjson", "io", file=file_name), NDJSONWriter(
+			ndjson_path(file_name, compress), compress
+		) as writer:
+			writer.write_many(records)
+
+		return writer.count
+
+	@staticmethod
+	def set_json(file_name: str, data, pretty: bool = False) -> None:
+		"""
+		Writes a dataset to `data/<file_name>.json` through the JSON codec, compact unless `pretty`.
+		"""
+		with span("write_json", "io", file=file_name):
+			write_json_atomic(f"{DATA_DIR}/{file_name}.json", data, pretty)
 
 	@staticmethod
 	def get_json_data(file_name: str) -> str:
-		with open(f"{DATA_DIR}/{file_name}.json", "r") as f:
-			json_data = json.load(f)
+		with span("read_json", "io", file=file_name), open(
+			f"{DATA_DIR}/{file_name}.json", "rb"
+		) as f:
+			json_data = loads(f.read())
 
 		return json_data
 
 	@staticmethod
-	def wait() -> None:
+	def data_path(file_name: str) -> str:
+		"""
+		Finds the file a dataset was saved to, preferring NDJSON over JSON.
 		"""
-		Waits a second.
+		for path in (
+			ndjson_path(file_name),
+			ndjson_path(file_name, compress=True),
+			f"{DATA_DIR}/{file_name}.json",
+		):
+			if os.path.isfile(path):
+				return path
 
-		Since the API has a wait period, every request we make needs to wait a little. It would get tedious real quick to type "sleep" or "time.sleep(1)"
+		raise FileNotFoundError(f"No data file found for '{file_name}' in {DATA_DIR}.")
+
+	@staticmethod
+	def iter_json_data(
+		file_name: str,
+		fields: Iterable[str] | None = None,
+		model: type[Record] | None = None,
+	) -> Iterator[dict | Record]:
+		"""
+		Lazily iterates the records of a dataset, without loading the whole file.
+
+		Args:
+			file_name: Name of the dataset in the data directory, without extension.
+			fields: Names or dotted paths of the fields to keep, such as ["id", "login"].
+			model: Record model the saved records are loaded into, such as `User` for a dataset extracted with it.
+
+		Yields:
+			Each record, projected to `fields` or loaded into `model` when given.
+		"""
+		records = iter_records(FT_Extractor.data_path(file_name), fields)
+		if model is not None:
+			records = map(model.from_json, records)
+		yield from records
+
+	@staticmethod
+	def get_json_record(
+		file_name: str, record_id, fields: Iterable[str] | None = None
+	) -> dict | None:
+		"""
+		Reads one record of an NDJSON dataset by id, through its sidecar offset index.
 		"""
-		time.sleep(1)
+		return get_record(ndjson_path(file_name), record_id, fields=fields)
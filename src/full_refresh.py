@@ -0,0 +1,121 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.resolve()))
+
+import argparse
+import logging
+from FT_Extractor import FT_Extractor
+from helpers.cache import ResponseCache
+from helpers.jobs import DEFAULT_MAX_JOBS, JobGraph
+from helpers.store import DEFAULT_STORE_FILE, SQLiteStore
+from helpers.tracing import start_tracing, stop_tracing
+from initial_extraction import extract_campus, extract_cursus
+from piscine_2025_start import (
+    extract_c_piscine_curriculum,
+    extract_piscine_2025_projects_init,
+    extract_piscine_2025_users,
+)
+from users_extraction_42rio import (
+    POOL_YEARS,
+    extract_42rio_pool_users,
+    extract_basecamp_projects,
+)
+
+
+def campus_id(extractor: FT_Extractor) -> int:
+    return next(extractor.load("campus_data", fields=["id"]))["id"]
+
+
+def build_graph(
+    logger: logging.Logger, resume: bool = False, full_refresh: bool = False
+) -> JobGraph:
+    """
+    Declares every extraction of a full refresh, with the datasets each one reads and writes.
+    """
+    graph = JobGraph()
+
+    graph.add(
+        "campus",
+        lambda extractor: extract_campus(logger, extractor),
+        outputs=["campus_data"],
+    )
+    graph.add(
+        "cursus",
+        lambda extractor: extract_cursus(logger, extractor),
+        outputs=["cursus_data"],
+    )
+    graph.add(
+        "c_piscine_curriculum",
+        lambda extractor: extract_c_piscine_curriculum(logger, extractor),
+        outputs=["c_piscine_projects"],
+    )
+    graph.add(
+        "basecamp_curriculum",
+        lambda extractor: extract_basecamp_projects(logger, extractor),
+        outputs=["basecamp_piscine_projects"],
+    )
+    graph.add(
+        "piscine_2025_users",
+        lambda extractor: extract_piscine_2025_users(
+            logger, extractor, campus_id(extractor)
+        ),
+        inputs=["campus_data"],
+        outputs=["piscine_2025_users"],
+    )
+    graph.add(
+        "piscine_2025_projects_init",
+        lambda extractor: extract_piscine_2025_projects_init(
+            logger,
+            extractor,
+            campus_id(extractor),
+            extractor.load("piscine_2025_users", fields=["id"]),
+            resume=resume,
+        ),
+        inputs=["campus_data", "piscine_2025_users"],
+        outputs=["piscine_2025_projects_init"],
+    )
+
+    for pool_year in POOL_YEARS:
+        graph.add(
+            f"piscines_{pool_year}_users",
+            lambda extractor, pool_year=pool_year: extract_42rio_pool_users(
+                logger, extractor, campus_id(extractor), pool_year, full_refresh
+            ),
+            inputs=["campus_data"],
+            outputs=[f"piscines_{pool_year}_users"],
+        )
+
+    return graph
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs every extraction, independent ones concurrently.")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_MAX_JOBS, help="Maximum number of extractions running at once.")
+    parser.add_argument("--resume", action="store_true", help="Resume checkpointed extractions of a crashed run.")
+    parser.add_argument("--full-refresh", action="store_true", help="Ignore the watermarks of incremental extractions.")
+    parser.add_argument("--metrics", metavar="PATH", help="Export the request metrics to PATH, as JSON for a .json file and Prometheus text otherwise.")
+    parser.add_argument("--trace", metavar="PATH", help="Write a trace of the run's phases to PATH, to open in Perfetto or chrome://tracing.")
+    parser.add_argument("--sqlite", action="store_true", help=f"Store the datasets in {DEFAULT_STORE_FILE} instead of JSON files.")
+    parser.add_argument("--pretty-json", action="store_true", help="Write indented JSON files instead of compact ones.")
+    args = parser.parse_args()
+
+    logger = logging.getLogger("FULL_REFRESH")
+    if args.trace:
+        start_tracing()
+    store = SQLiteStore() if args.sqlite else None
+    extractor = FT_Extractor(cache=ResponseCache(), store=store, pretty_json=args.pretty_json)
+
+    graph = build_graph(logger, resume=args.resume, full_refresh=args.full_refresh)
+    report = graph.run(extractor, max_workers=args.jobs)
+
+    extractor.set_json("full_refresh_report", report.summary(), args.pretty_json)
+    logger.info(f"Run summary:\n{extractor.metrics.summary()}")
+    if args.metrics:
+        extractor.metrics.write(args.metrics)
+    if args.trace:
+        stop_tracing(args.trace)
+        logger.info(f"Trace written to {args.trace}.")
+    if store is not None:
+        store.close()
+    sys.exit(0 if report.ok else 1)
@@ -5,27 +5,38 @@ sys.path.append(str(Path(__file__).parent.parent.resolve()))
 
 import logging
 from FT_Extractor import FT_Extractor
-from environs import env
-
-env.read_env()
+from helpers.cache import ResponseCache
 
 FILTERS = {"campus": {"filter[city]": "Rio de Janeiro"}}
 
+def extract_campus(logger: logging.Logger, extractor: FT_Extractor) -> None:
+    campus_data = extractor.basic_extraction("campus", **FILTERS["campus"])
+
+    logger.info("Saving JSON for Campus...")
+    extractor.save("campus_data", campus_data)
+
+
+def extract_cursus(logger: logging.Logger, extractor: FT_Extractor) -> None:
+    cursus_data = extractor.basic_extraction(
+        "cursus",
+    )
+
+    logger.info("Saving JSON for Cursus...")
+    extractor.save("cursus_data", cursus_data)
+
+
 def initial_extraction():
     logger = logging.getLogger("INITIAL_EXTRACTION")
-    extractor = FT_Extractor()
+    extractor = FT_Extractor(cache=ResponseCache())
 
     logger.info(
         "Initiating Initial Extraction: Campus and Cursus..."
     )
 
-    campus_data = extractor.basic_extraction("campus", **FILTERS["campus"])
-    cursus_data = extractor.basic_extraction(
-        "cursus",
-    )
+    extract_campus(logger, extractor)
+    extract_cursus(logger, extractor)
 
-    extractor.set_json("campus_data", campus_data)
-    extractor.set_json("cursus_data", cursus_data)
+    logger.info(f"Run summary:\n{extractor.metrics.summary()}")
 
 
 if __name__ == "__main__":
@@ -3,19 +3,14 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent.resolve()))
 
-import json
-from helpers.utils import get_students_filter, get_campus, get_project_users_filter
+from helpers.utils import iter_students_pages, get_campus, iter_project_users_pages
 from FT_Client import FT_Client
+from helpers.sinks import NDJSONWriter
+from helpers.readers import iter_records
+from helpers.config import setup_logging
 import logging
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-
-from environs import env
-
-env.read_env()
+setup_logging()
 
 BASE_DIR = Path(__file__).parent.parent.resolve()
 DATA_DIR = BASE_DIR / "data"
@@ -24,11 +19,8 @@ if __name__ == '__main__':
     logger = logging.getLogger(__name__)
     client = FT_Client()
 
-    total_data = []
-
-    campus = None
-    with open(f'{DATA_DIR}/rio_data.json', 'r') as f:
-        campus = json.load(f)
+    campus_file = Path(f'{DATA_DIR}/rio_data.json')
+    campus = next(iter_records(campus_file, fields=["id"]), None) if campus_file.is_file() else None
     
     if campus is None:
         logger.error("Unable to read campus data from file...")
@@ -41,10 +33,9 @@ if __name__ == '__main__':
     
     logger.info(f"Campus ID: {campus['id']}")
 
-    users = None
-    with open(f'{DATA_DIR}/piscine_2025_users.json', 'r') as f:
-        users = json.load(f)
-    
+    users_file = Path(f'{DATA_DIR}/piscine_2025_users.ndjson')
+    users = iter_records(users_file, fields=["id"]) if users_file.is_file() else None
+
     if users is None:
         logger.error("Unable to read users data from file...")
         logger.info("Retrieving users data again.")
@@ -54,34 +45,30 @@ if __name__ == '__main__':
             'primary_campus_id': campus['id']
         }
 
-        users = get_students_filter(
-            client.token,
-            **filters
+        users = (
+            user
+            for page in iter_students_pages(client.token, client.session, **filters)
+            for user in page
         )
     
-    for user in users:
-        filters = {
-            'cursus': 9
-        }
+    filters = {
+        'cursus': 9
+    }
 
-        data = get_project_users_filter(
+    logger.info("Trying to save Pisciners' Project data...")
+    with NDJSONWriter(f'{DATA_DIR}/piscine_2025_projects.ndjson') as writer:
+        for page in iter_project_users_pages(
             client.token,
-            user,
+            (user['id'] for user in users),
+            session=client.session,
             **filters
-        )
+        ):
+            writer.write_many(item for item in page if item is not None)
 
-        total_data.append(data)
-    
-    flat_data = [item for sublist in total_data for item in sublist if item is not None]
-    if flat_data is None:
+    if writer.count == 0:
         logger.error("No Pisciners' Project data...")
-        raise ValueError("No data to be written...")
-    
-    logger.info("Trying to save Pisciners' Project data...")
-    with open(f'{DATA_DIR}/piscine_2025_projects.json', 'w', encoding='utf-8') as f:
-        json.dump(flat_data, f, ensure_ascii=False, indent=4)
 
-    piscine_project_file = Path(f'{DATA_DIR}/piscine_2025_projects.json')
+    piscine_project_file = Path(f'{DATA_DIR}/piscine_2025_projects.ndjson')
     
     if piscine_project_file.is_file():
         logger.info("Pisciners' Project Data saved successfully!")
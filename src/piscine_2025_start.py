@@ -4,10 +4,10 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent.resolve()))
 
 import logging
+from typing import Iterable
 from FT_Extractor import FT_Extractor
-from environs import env
-
-env.read_env()
+from helpers.cache import ResponseCache
+from helpers.tracing import span
 
 def extract_c_piscine_curriculum(
         logger: logging.Logger,
@@ -19,7 +19,7 @@ def extract_c_piscine_curriculum(
 
     logger.info(f"Saving JSON for C Piscine Curriculum...")
     logger.info(f"Total projects found: {len(projects_data)}")
-    extractor.set_json("c_piscine_projects", projects_data)
+    extractor.save("c_piscine_projects", projects_data)
 
 def extract_piscine_2025_users(
     logger: logging.Logger, extractor: FT_Extractor, campus_id: int
@@ -29,46 +29,56 @@ def extract_piscine_2025_users(
 
     logger.info(f"Total users found: {len(users_data)}.")
     logger.info("Saving JSON for Users...")
-    extractor.set_json("piscine_2025_users", users_data)
+    extractor.save("piscine_2025_users", users_data)
 
 
 def extract_piscine_2025_projects_init(
-    logger: logging.Logger, extractor: FT_Extractor, campus_id: int, user_data: dict
+    logger: logging.Logger,
+    extractor: FT_Extractor,
+    campus_id: int,
+    user_data: Iterable[dict],
+    resume: bool = False,
 ) -> None:
     projects_filters = {"cursus": 9, "campus": campus_id}
-    projects_data = []
-
-    for user in user_data:
-        instance_data = extractor.filtered_extraction(
-            "projects",
-            "users/{user_id}/projects_users",
-            {"user_id": user["id"]},
-            **projects_filters
-        )
-
-        projects_data.append(instance_data)
-    
-    all_items = []
-    for data in projects_data:
-        all_items.extend(data)
+    journal = extractor.checkpoint("piscine_2025_projects_init", resume)
+    projects_by_user = extractor.batched_extraction(
+        "projects_users",
+        "user_id",
+        [user["id"] for user in user_data],
+        lambda project_user: project_user["user"]["id"],
+        journal=journal,
+        **projects_filters
+    )
+
+    with span("flatten", "cpu", users=len(projects_by_user)):
+        all_items = [
+            project_user
+            for projects in projects_by_user.values()
+            for project_user in projects
+        ]
 
     logger.info("Saving JSON for Initial Projects...")
-    extractor.set_json("piscine_2025_projects_init", all_items)
+    extractor.save("piscine_2025_projects_init", all_items)
+    journal.clear()
 
 
 if __name__ == "__main__":
     logger = logging.getLogger("INITIAL_EXTRACTION")
-    extractor = FT_Extractor()
+    extractor = FT_Extractor(cache=ResponseCache())
 
     logger.info("Fetching C Piscine Curriculum...")
     extract_c_piscine_curriculum(logger, extractor)
 
     logger.info("Fetching Campus Data...")
-    campus = extractor.get_json_data("campus_data")
+    campus_id = next(extractor.load("campus_data", fields=["id"]))["id"]
 
-    extract_piscine_2025_users(logger, extractor, campus["id"])
+    extract_piscine_2025_users(logger, extractor, campus_id)
 
     logger.info("Fetching Users Data...")
-    users_data = extractor.get_json_data("piscine_2025_users")
+    users_data = extractor.iter_json_data("piscine_2025_users", fields=["id"])
+
+    extract_piscine_2025_projects_init(
+        logger, extractor, campus_id, users_data, resume="--resume" in sys.argv
+    )
 
-    extract_piscine_2025_projects_init(logger, extractor, campus['id'], users_data)
+    logger.info(f"Run summary:\n{extractor.metrics.summary()}")
@@ -3,19 +3,14 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent.resolve()))
 
-import json
-from helpers.utils import get_students_filter, get_campus
+from helpers.utils import iter_students_pages, get_campus
 from FT_Client import FT_Client
+from helpers.sinks import NDJSONWriter
+from helpers.readers import iter_records
+from helpers.config import setup_logging
 import logging
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-
-from environs import env
-
-env.read_env()
+setup_logging()
 
 BASE_DIR = Path(__file__).parent.parent.resolve()
 DATA_DIR = BASE_DIR / "data"
@@ -24,9 +19,8 @@ if __name__ == '__main__':
     logger = logging.getLogger(__name__)
     client = FT_Client()
 
-    campus = None
-    with open(f'{DATA_DIR}/rio_data.json', 'r') as f:
-        campus = json.load(f)
+    campus_file = Path(f'{DATA_DIR}/rio_data.json')
+    campus = next(iter_records(campus_file, fields=["id"]), None) if campus_file.is_file() else None
     
     if campus is None:
         logger.error("Unable to read campus data from file...")
@@ -42,20 +36,15 @@ if __name__ == '__main__':
             'primary_campus_id': campus['id']
     }
 
-    pisciners_data = get_students_filter(
-        client.token,
-        **filters
-    )
+    logger.info('Trying to save Pisciners data...')
+    with NDJSONWriter(f'{DATA_DIR}/piscine_2025_users.ndjson') as writer:
+        for page in iter_students_pages(client.token, client.session, **filters):
+            writer.write_many(page)
 
-    if pisciners_data is None:
+    if writer.count == 0:
         logger.error("No Pisciners data...")
-        raise ValueError("No data to be written...")
 
-    logger.info('Trying to save Pisciners data...')
-    with open(f'{DATA_DIR}/piscine_2025_users.json', 'w', encoding='utf-8') as f:
-        json.dump(pisciners_data, f, ensure_ascii=False, indent=4)
-    
-    pisciners_data_file = Path(f'{DATA_DIR}/piscine_2025_users.json')
+    pisciners_data_file = Path(f'{DATA_DIR}/piscine_2025_users.ndjson')
     
     if pisciners_data_file.is_file():
         logger.info('Pisciners Data saved successfully!')